@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   bench-clear.py
+# * | Function    :   Benchmark of EPD.Clear data transfer: per controller vs broadcast
+# * | Info        :   Run on the Pi (maintenance mode): sudo python3 bench-clear.py
+# * |             :   Ends with one full white refresh, no shutdown
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import sys
+import os
+import time
+import traceback
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, 'lib')
+sys.path.append(libdir)
+
+import epd13in3E
+import epdconfig
+
+ROUNDS = 3
+
+epd = epd13in3E.EPD()
+
+
+def measure(broadcast, rounds):
+    best = None
+    for _ in range(rounds):
+        epdconfig.spi_stats(reset=True)
+        start = time.perf_counter()
+        epd.write_clear(broadcast=broadcast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    calls, nbytes = epdconfig.spi_stats(reset=True)
+    return best, calls // rounds, nbytes // rounds
+
+
+def bench(rounds=ROUNDS):
+    try:
+        epd.Init()
+
+        t_legacy, c_legacy, b_legacy = measure(False, rounds)
+        t_bcast, c_bcast, b_bcast = measure(True, rounds)
+
+        print(f"Clear data transfer, best of {rounds}")
+        print(f"Per controller : {t_legacy * 1000:8.1f} ms, {c_legacy:5d} SPI calls, {b_legacy} bytes")
+        print(f"Broadcast      : {t_bcast * 1000:8.1f} ms, {c_bcast:5d} SPI calls, {b_bcast} bytes")
+        print(f"Saved per boot : {(t_legacy - t_bcast) * 1000:8.1f} ms")
+
+        # Leave the panel in a defined (white) state
+        epd.TurnOnDisplay()
+        epd.sleep()
+    except Exception:
+        epd.sleep()
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) == 2 else ROUNDS)
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   bench-import.py
+# * | Function    :   Import time of refresh.py against its budget (IMPORT_BUDGET_MS)
+# * | Info        :   Run on the Pi: python3 bench-import.py
+# * |             :   Fresh interpreter per round (python3 -X importtime), no panel access
+# * |             :   EPD_BACKEND=emu python3 bench-import.py    without RPi.GPIO / spidev
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import sys
+import os
+import subprocess
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+
+ROUNDS = 5
+TOP = 15
+
+# Must not be imported on the precomposed frame path
+HEAVY_MODULES = ("numpy", "PIL")
+
+CHECK = ("import sys, refresh; print(refresh.IMPORT_BUDGET_MS, "
+         "*(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,))
+
+
+def run_once():
+    """
+    Imports refresh in a fresh interpreter.
+    Returns ({module: cumulative us}, total us, budget ms, heavy modules loaded).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHECK],
+                            cwd=current_dir, capture_output=True, text=True, check=True)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative_us)
+    budget, *heavy = result.stdout.splitlines()[0].split()
+    return modules, modules.get("refresh", 0), int(budget), heavy
+
+
+def bench(rounds=ROUNDS):
+    runs = [run_once() for _ in range(rounds)]
+    modules, total, budget, heavy = min(runs, key=lambda r: r[1])
+
+    print(f"Import of refresh, best of {rounds}: {total / 1000:.1f} ms (budget {budget} ms)")
+    print(f"{'cumulative ms':>14}  module")
+    top = sorted(((us, name) for name, us in modules.items() if not name.startswith("encodings")), reverse=True)
+    for us, name in top[:TOP]:
+        print(f"{us / 1000:14.1f}  {name}")
+
+    ok = True
+    if heavy:
+        print(f"FAIL: imported at startup: {', '.join(heavy)}")
+        ok = False
+    if total / 1000 > budget:
+        print(f"FAIL: over budget by {total / 1000 - budget:.1f} ms")
+        ok = False
+    print("OK" if ok else "Import budget exceeded")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if bench() else 1)
@@ -0,0 +1,118 @@
+# /*****************************************************************************
+# * | File        :   artbundle.py
+# * | Function    :   Single-file artwork bundle (metadata + frames)
+# * | Info        :   Replaces pic/index.json + one file per day
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# Layout (little endian):
+#
+#   header        32 bytes   magic, version, flags, record count
+#   offset table  count x 16 bytes, entry N-1 describes artwork N (1-based)
+#                 record offset (u64), frame length (u32), metadata length (u16),
+#                 frame kind (u16)
+#   records       metadata (UTF-8 JSON) immediately followed by the frame,
+#                 every record starts on a RECORD_ALIGN boundary
+#
+# A lookup needs one open, two tiny reads (header, table entry) and one read
+# of the record. The bundle is never mapped as a whole: lockit() (mlockall)
+# would otherwise pull the entire catalog into RAM.
+
+import os
+import json
+import struct
+
+BUNDLE_FILE = "art.e6b"
+BUNDLE_MAGIC = b"E6BD"
+BUNDLE_VERSION = 1
+
+BUNDLE_HEADER = struct.Struct("<4sBBHI20x")  # magic, version, flags, reserved, count
+BUNDLE_ENTRY = struct.Struct("<QIHH")        # offset, frame len, meta len, kind
+
+RECORD_ALIGN = 4096
+
+KIND_E6 = 0    # pre-packed panel frame (lib/epdframe.py)
+KIND_BMP = 1   # 8bpp BMP file from tools/convert.py
+
+
+def read_count(path):
+    """
+    Returns the number of artworks stored in the bundle.
+    """
+    with open(path, "rb") as f:
+        return _read_header(f.fileno(), path)
+
+
+def read_record(path, index):
+    """
+    Reads the metadata and the frame of artwork 1..count.
+
+    Returns:
+        (dict, int, memoryview): metadata record, frame kind, frame bytes
+    """
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        count = _read_header(fd, path)
+        if not 1 <= index <= count:
+            raise ValueError(f"No record at position {index}")
+
+        entry = os.pread(fd, BUNDLE_ENTRY.size, BUNDLE_HEADER.size + (index - 1) * BUNDLE_ENTRY.size)
+        offset, frame_len, meta_len, kind = BUNDLE_ENTRY.unpack(entry)
+
+        data = os.pread(fd, meta_len + frame_len, offset)
+
+    if len(data) != meta_len + frame_len:
+        raise ValueError(f"Truncated record {index} in {path}")
+
+    meta = json.loads(data[:meta_len].decode("utf-8"))
+    return meta, kind, memoryview(data)[meta_len:]
+
+
+def write_bundle(path, count, records):
+    """
+    Writes a bundle. Records are consumed one by one, so the frames do not
+    have to be held in memory together.
+
+    Args:
+        path: output file
+        count: number of records
+        records: iterable of (metadata dict, frame kind, frame bytes),
+                 position in the sequence is the 1-based artwork number
+    """
+    table = []
+    offset = _align(BUNDLE_HEADER.size + count * BUNDLE_ENTRY.size)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for meta, kind, frame in records:
+            meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            f.seek(offset)
+            f.write(meta_bytes)
+            f.write(frame)
+            table.append(BUNDLE_ENTRY.pack(offset, len(frame), len(meta_bytes), kind))
+            offset = _align(offset + len(meta_bytes) + len(frame))
+
+        if len(table) != count:
+            raise ValueError(f"Expected {count} records, got {len(table)}")
+
+        f.seek(0)
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, 0, count))
+        f.write(b"".join(table))
+    os.replace(tmp_path, path)
+
+
+def _read_header(fd, path):
+    magic, version, flags, reserved, count = BUNDLE_HEADER.unpack(os.pread(fd, BUNDLE_HEADER.size, 0))
+    if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+        raise ValueError(f"Not an artwork bundle: {path}")
+    return count
+
+
+def _align(offset):
+    return (offset + RECORD_ALIGN - 1) // RECORD_ALIGN * RECORD_ALIGN
+
+### END OF FILE ###
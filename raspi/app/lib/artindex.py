@@ -0,0 +1,123 @@
+# /*****************************************************************************
+# * | File        :   artindex.py
+# * | Function    :   Binary catalog index (title, artist, year per artwork)
+# * | Info        :   Replaces pic/index.json at runtime, one record per lookup
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# Layout (little endian):
+#
+#   header        32 bytes   magic, version, flags, record stride, record count
+#   records       count x stride bytes, record N-1 describes artwork N (1-based)
+#                 title offset (u32), artist offset (u32), title length (u16),
+#                 artist length (u16), year (i16, NO_YEAR if unknown), reserved
+#   strings       UTF-8 string table, offsets are relative to its start,
+#                 repeated strings (artist names) are stored once
+#
+# A lookup maps the file and touches the header, one record and its two
+# strings: the cost does not grow with the catalog. The mapping is closed
+# before returning, lockit() (mlockall) never sees it.
+
+import os
+import mmap
+import struct
+
+INDEX_FILE = "index.e6i"
+INDEX_MAGIC = b"E6IX"
+INDEX_VERSION = 1
+
+INDEX_HEADER = struct.Struct("<4sBBHI20x")  # magic, version, flags, stride, count
+INDEX_RECORD = struct.Struct("<IIHHh2x")    # title off, artist off, title len, artist len, year
+
+NO_YEAR = -0x8000
+
+
+def read_count(path):
+    """
+    Returns the number of artworks in the index.
+    """
+    with open(path, "rb") as f:
+        header = f.read(INDEX_HEADER.size)
+    return _parse_header(header, path)[1]
+
+
+def read_record(path, index):
+    """
+    Reads artwork 1..count.
+
+    Returns:
+        dict: "title", "artistName", "completitionYear" (None if unknown),
+              the keys of index.json
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+    try:
+        stride, count = _parse_header(mm[:INDEX_HEADER.size], path)
+        if not 1 <= index <= count:
+            raise ValueError(f"No record at position {index}")
+
+        strings = INDEX_HEADER.size + count * stride
+        title_off, artist_off, title_len, artist_len, year = \
+            INDEX_RECORD.unpack_from(mm, INDEX_HEADER.size + (index - 1) * stride)
+        title = mm[strings + title_off:strings + title_off + title_len]
+        artist = mm[strings + artist_off:strings + artist_off + artist_len]
+        if len(title) != title_len or len(artist) != artist_len:
+            raise ValueError(f"Truncated record {index} in {path}")
+    finally:
+        mm.close()
+
+    return {
+        "index": index,
+        "title": title.decode("utf-8"),
+        "artistName": artist.decode("utf-8"),
+        "completitionYear": None if year == NO_YEAR else year,
+    }
+
+
+def write_index(path, records):
+    """
+    Writes an index.
+
+    Args:
+        path: output file
+        records: list of index.json records, position is the 1-based artwork number
+    """
+    table = []
+    strings = bytearray()
+    offsets = {}
+
+    def add(text):
+        data = (text or "").encode("utf-8")
+        if len(data) > 0xFFFF:
+            raise ValueError(f"String too long: {text[:40]}...")
+        if data not in offsets:
+            offsets[data] = len(strings)
+            strings.extend(data)
+        return offsets[data], len(data)
+
+    for record in records:
+        title_off, title_len = add(record.get("title"))
+        artist_off, artist_len = add(record.get("artistName"))
+        year = record.get("completitionYear")
+        table.append(INDEX_RECORD.pack(title_off, artist_off, title_len, artist_len,
+                                       NO_YEAR if year is None else year))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, INDEX_RECORD.size, len(table)))
+        f.write(b"".join(table))
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+
+def _parse_header(header, path):
+    magic, version, flags, stride, count = INDEX_HEADER.unpack(header)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION or stride < INDEX_RECORD.size:
+        raise ValueError(f"Not a catalog index: {path}")
+    return stride, count
+
+### END OF FILE ###
@@ -0,0 +1,248 @@
+# /*****************************************************************************
+# * | File        :   bootlog.py
+# * | Function    :   Crash-safe ring log, one binary record per boot
+# * | Info        :   Preallocated file, one aligned pwrite + fdatasync per boot
+# *----------------
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Day index stored as u32 (catalogs beyond 65535 artworks),
+# * |             :   latest slot found by binary search, directory fsync on create
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# Layout (little endian):
+#
+#   slot 0           header: magic, version, slot size, slot count
+#   slot 1..SLOTS    records, boot with sequence number N goes to slot 1 + N % SLOTS
+#
+# Every record fits one SLOT_SIZE (disk sector) slot and ends with a CRC32,
+# its magic selects the layout (records written before V1.1 are still read),
+# so a write torn by a power cut only loses that record. The file is created
+# at full size once, later boots never change its size or metadata and
+# fdatasync() flushes a single sector.
+
+import os
+import math
+import struct
+import zlib
+
+RING_FILE = "boot.ring"
+RING_MAGIC = b"E6RG"
+RECORD_MAGIC = b"E6R2"
+RECORD_V1_MAGIC = b"E6RC"   # u16 day index
+RING_VERSION = 1
+
+SLOT_SIZE = 512
+SLOTS = 1024        # about 3 years of daily boots, 512 KiB
+
+RING_HEADER = struct.Struct("<4sHHI")
+
+# Fixed phase and BUSY tables, a record stores values by position / id
+PHASES = ("boot", "cache_data", "init", "clear", "compose", "display", "shutdown")
+MAX_PHASES = 8
+BUSY_PHASES = ("reset", "pon", "drf", "pof")
+MAX_BUSY = 16
+NO_BUSY = 0xFF
+
+FLAG_SKIPPED = 0x01     # frame already displayed
+FLAG_CLEARED = 0x02     # white clear refresh done
+FLAG_ERROR = 0x04       # exception during the refresh
+FLAG_SLOW = 0x08        # a BUSY wait took longer than expected (epd13in3E.BUSY_EXPECTED)
+FLAG_TIMEOUT = 0x10     # a BUSY wait hit its deadline, refresh aborted
+FLAG_WATCHDOG = 0x20    # refresh watchdog expired, panel powered off by the watchdog
+
+# magic, seq, unix time, day index, flags, voltage, current, celsius, SOC, uptime,
+# mAh, phase seconds, phase mAh, busy ids, busy seconds
+RECORD = struct.Struct(f"<4sIqIHffffff{MAX_PHASES}f{MAX_PHASES}f{MAX_BUSY}B{MAX_BUSY}f")
+RECORD_V1 = struct.Struct(f"<4sIqHHffffff{MAX_PHASES}f{MAX_PHASES}f{MAX_BUSY}B{MAX_BUSY}f")
+RECORDS = {RECORD_MAGIC: RECORD, RECORD_V1_MAGIC: RECORD_V1}
+RECORD_CRC = struct.Struct("<I")
+
+FIELDS = ("seq", "time", "index", "flags", "voltage", "current", "celsius", "soc", "uptime_s", "mAh")
+
+
+def _float(value):
+    return math.nan if value is None else float(value)
+
+
+def _value(value):
+    return None if math.isnan(value) else round(value, 4)
+
+
+def encode_record(seq, record):
+    """
+    Packs one boot record into a SLOT_SIZE slot.
+
+    Args:
+        seq: boot sequence number
+        record: dict with FIELDS (None for unknown), "phases" {name: (seconds, mAh)}
+                and "busy" [(phase, seconds)]
+    """
+    phase_s = [math.nan] * MAX_PHASES
+    phase_mah = [math.nan] * MAX_PHASES
+    for name, (seconds, mah) in record.get("phases", {}).items():
+        if name in PHASES:
+            phase_s[PHASES.index(name)] = _float(seconds)
+            phase_mah[PHASES.index(name)] = _float(mah)
+
+    busy = [(BUSY_PHASES.index(p), t) for p, t in record.get("busy", []) if p in BUSY_PHASES][:MAX_BUSY]
+    busy_ids = [b[0] for b in busy] + [NO_BUSY] * (MAX_BUSY - len(busy))
+    busy_s = [float(b[1]) for b in busy] + [math.nan] * (MAX_BUSY - len(busy))
+
+    body = RECORD.pack(RECORD_MAGIC, seq, int(record.get("time", 0)), record.get("index", 0),
+                       record.get("flags", 0),
+                       *(_float(record.get(k)) for k in ("voltage", "current", "celsius", "soc", "uptime_s", "mAh")),
+                       *phase_s, *phase_mah, *busy_ids, *busy_s)
+    body += RECORD_CRC.pack(zlib.crc32(body))
+    return body.ljust(SLOT_SIZE, b"\0")
+
+
+def decode_record(slot):
+    """
+    Returns the record dict of a slot, None for an empty or torn slot.
+    """
+    layout = RECORDS.get(bytes(slot[:4]))
+    if layout is None or len(slot) < layout.size + RECORD_CRC.size:
+        return None
+    body = slot[:layout.size]
+    (crc,) = RECORD_CRC.unpack_from(slot, layout.size)
+    if crc != zlib.crc32(body):
+        return None
+
+    values = layout.unpack(body)
+    seq, t, index, flags = values[1:5]
+    record = {"seq": seq, "time": t, "index": index, "flags": flags}
+    for key, value in zip(FIELDS[4:], values[5:11]):
+        record[key] = _value(value)
+
+    pos = 11
+    phase_s = values[pos:pos + MAX_PHASES]
+    phase_mah = values[pos + MAX_PHASES:pos + 2 * MAX_PHASES]
+    record["phases"] = {name: (_value(phase_s[i]), _value(phase_mah[i]))
+                        for i, name in enumerate(PHASES) if not math.isnan(phase_s[i])}
+
+    pos += 2 * MAX_PHASES
+    busy_ids = values[pos:pos + MAX_BUSY]
+    busy_s = values[pos + MAX_BUSY:pos + 2 * MAX_BUSY]
+    record["busy"] = [(BUSY_PHASES[i], _value(t)) for i, t in zip(busy_ids, busy_s)
+                      if i != NO_BUSY and i < len(BUSY_PHASES)]
+    return record
+
+
+def create_ring(path, slots=SLOTS):
+    """
+    Creates the ring file at full size: header slot + empty record slots.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(RING_HEADER.pack(RING_MAGIC, RING_VERSION, SLOT_SIZE, slots).ljust(SLOT_SIZE, b"\0"))
+        f.truncate(SLOT_SIZE * (slots + 1))
+        os.posix_fallocate(f.fileno(), 0, SLOT_SIZE * (slots + 1))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # the new directory entry must survive a power cut as well
+    dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _read_header(fd, path):
+    magic, version, slot_size, slots = RING_HEADER.unpack(os.pread(fd, RING_HEADER.size, 0))
+    if magic != RING_MAGIC or version != RING_VERSION or slot_size != SLOT_SIZE:
+        raise ValueError(f"Not a boot ring: {path}")
+    return slots
+
+
+def read_records(path):
+    """
+    Returns all valid records, oldest first.
+    """
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        slots = _read_header(fd, path)
+        data = os.pread(fd, SLOT_SIZE * slots, SLOT_SIZE)
+
+    records = [decode_record(data[i:i + SLOT_SIZE]) for i in range(0, len(data), SLOT_SIZE)]
+    return sorted((r for r in records if r is not None), key=lambda r: r["seq"])
+
+
+def _slot_seq(fd, slot):
+    record = decode_record(os.pread(fd, SLOT_SIZE, SLOT_SIZE * (1 + slot)))
+    return None if record is None else record["seq"]
+
+
+def _scan_seq(fd, slots):
+    data = os.pread(fd, SLOT_SIZE * slots, SLOT_SIZE)
+    last = -1
+    for i in range(0, len(data), SLOT_SIZE):
+        if data[i:i + 4] in RECORDS:
+            record = decode_record(data[i:i + SLOT_SIZE])
+            if record is not None:
+                last = max(last, record["seq"])
+    return last
+
+
+def last_seq(fd, slots):
+    """
+    Returns the latest sequence number in the ring, -1 if empty.
+
+    Slot i holds seq i + k * slots, k drops by one after the latest slot
+    (or the slot is empty / torn): binary search, about log2(slots) slot
+    reads. A ring which does not follow this order is read in full.
+    """
+    first = _slot_seq(fd, 0)
+    if first is None:
+        # empty ring, or the write of slot 0 was torn: the latest is in the last slot
+        last = _slot_seq(fd, slots - 1)
+        if last is not None:
+            return last
+        return -1 if _slot_seq(fd, 1) is None else _scan_seq(fd, slots)
+    if first % slots:
+        return _scan_seq(fd, slots)
+
+    cycle = first // slots
+    lo, hi = 0, slots - 1       # slot lo belongs to the current cycle
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        seq = _slot_seq(fd, mid)
+        if seq is not None and seq == cycle * slots + mid:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    latest = cycle * slots + lo
+    after = _slot_seq(fd, lo + 1) if lo + 1 < slots else None
+    if after is not None and after != latest + 1 - slots:
+        return _scan_seq(fd, slots)
+    return latest
+
+
+def append_record(path, record):
+    """
+    Writes one boot record into the next slot: a few slot reads (latest
+    sequence number, see last_seq), one SLOT_SIZE pwrite at a slot boundary,
+    one fdatasync. Returns the sequence number written.
+    """
+    if not os.path.exists(path):
+        create_ring(path)
+
+    fd = os.open(path, os.O_RDWR)
+    try:
+        slots = _read_header(fd, path)
+        seq = last_seq(fd, slots) + 1
+        os.pwrite(fd, encode_record(seq, record), SLOT_SIZE * (1 + seq % slots))
+        os.fdatasync(fd)
+        return seq
+    finally:
+        os.close(fd)
+
+### END OF FILE ###
@@ -0,0 +1,120 @@
+# /*****************************************************************************
+# * | File        :   energy.py
+# * | Function    :   Per-boot energy accounting from Witty Pi 4 telemetry
+# * | Info        :   Background sampler of output current / voltages,
+# * |             :   integrated per phase of refresh.py
+# *----------------
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Only the first failed I2C read is printed, the rest are counted
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# A sample is taken every 1 / SAMPLE_HZ seconds and at every phase change,
+# so each interval between two samples belongs to exactly one phase. The
+# interval is integrated with the trapezoidal rule:
+#
+#   mAh = I_out [A] x t [s] / 3.6          (5 V rail, what the Pi + HAT draw)
+#   mWh = V_out [V] x I_out [A] x t [s] / 3.6
+#
+# Energy spent before the sampler starts (kernel, systemd) and in the final
+# sync + power-off cannot be sampled by the same boot; the time since power
+# on is recorded as uptime_s.
+
+import time
+import threading
+
+SAMPLE_HZ = 2       # I2C reads per second, 0 = only at phase changes
+
+
+def uptime():
+    try:
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+    except Exception:
+        return None
+
+
+class EnergySampler:
+    def __init__(self, witty, hz=SAMPLE_HZ):
+        self.witty = witty
+        self.hz = hz
+        self.samples = []           # (monotonic s, phase, V in, V out, I out)
+        self.current = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.uptime_s = None
+        self.errors = 0             # failed reads, only the first one is printed
+
+    def start(self, phase="boot"):
+        self.uptime_s = uptime()
+        self.phase(phase)
+        if self.hz > 0:
+            self.thread = threading.Thread(target=self._run, name="energy", daemon=True)
+            self.thread.start()
+        return self
+
+    def phase(self, name):
+        """Closes the running phase and starts `name`."""
+        with self.lock:
+            self.current = name
+            self._sample()
+
+    def stop(self):
+        """Stops sampling and returns the summary (see summary())."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        with self.lock:
+            self._sample()
+            self.current = None
+        return self.summary()
+
+    def _run(self):
+        while not self.stop_event.wait(1.0 / self.hz):
+            with self.lock:
+                self._sample()
+
+    def _sample(self):
+        vin, vout, iout = self.witty.power(report=self.errors == 0)
+        if iout is None:
+            self.errors += 1
+        self.samples.append((time.monotonic(), self.current, vin, vout, iout))
+
+    def summary(self):
+        """
+        Returns {"phases": {phase: [seconds, mAh, mWh]}, "mAh", "mWh",
+        "samples", "errors", "uptime_s"}, phases in order of first appearance.
+        errors counts the failed I2C reads among the samples.
+        """
+        phases = {}
+        prev = None
+        for t, phase, vin, vout, iout in self.samples:
+            if iout is None and prev is not None:
+                vout, iout = prev[3], prev[4]       # failed read, hold the last value
+            if prev is not None:
+                dt = t - prev[0]
+                stats = phases.setdefault(prev[1], [0.0, 0.0, 0.0])
+                stats[0] += dt
+                if prev[4] is not None and iout is not None:
+                    i_avg = (prev[4] + iout) / 2
+                    stats[1] += i_avg * dt / 3.6
+                    if prev[3] is not None and vout is not None:
+                        stats[2] += (prev[3] + vout) / 2 * i_avg * dt / 3.6
+            prev = (t, phase, vin, vout, iout)
+
+        return {
+            "phases": {name: [round(s, 2), round(mah, 4), round(mwh, 3)] for name, (s, mah, mwh) in phases.items()},
+            "mAh": round(sum(p[1] for p in phases.values()), 4),
+            "mWh": round(sum(p[2] for p in phases.values()), 3),
+            "samples": len(self.samples),
+            "errors": self.errors,
+            "uptime_s": None if self.uptime_s is None else round(self.uptime_s, 1),
+        }
+
+### END OF FILE ###
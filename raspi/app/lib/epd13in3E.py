@@ -34,14 +34,92 @@ import os
 import sys
 import ctypes
 import time
+import queue
+import threading
 import epdconfig
-import PIL
-from PIL import Image
+import epdframe
 import io
 
 EPD_WIDTH       = 1200
 EPD_HEIGHT      = 1600
 
+STREAM_DEPTH    = 4     # chunks buffered between producer thread and SPI
+STREAM_PUT_TIMEOUT = 0.5    # s, a blocked producer re-checks if the transfer stopped
+CLEAR_BROADCAST = False # Clear both controllers with one transfer (CS_ALL). Only
+                        # checked on the emulator: enable after bench-clear.py on the panel
+BUSY_TIMEOUT    = 120   # seconds, deadline of a BUSY wait not listed below
+
+# Normal BUSY durations (s). Estimates, not measurements: the emulator model
+# (epdemu.py, DRF 19 s) with about 30 % margin. Replace them with the busy_*_s
+# columns of boot.ring (tools/bootlog-csv.py) once measured on the frame.
+# A longer wait is recorded as slow (e.g. cold room), the refresh goes on.
+BUSY_EXPECTED   = {"reset": 0.1, "pon": 0.5, "drf": 25.0, "pof": 0.5}
+# Deadlines (s): past them the panel is considered hung, BusyTimeout is raised
+# and the caller aborts through sleep() (module_exit powers the panel down)
+BUSY_DEADLINES  = {"reset": 5, "pon": 10, "drf": 90, "pof": 10}
+# EPD.abort() (refresh watchdog, another thread): BUSY waits check the abort
+# request every ABORT_CHECK_S, abort() waits ABORT_LOCK_TIMEOUT for the panel
+ABORT_CHECK_S       = 0.5
+ABORT_LOCK_TIMEOUT  = 15
+
+# Chip select target of a command
+CS_MASTER       = 1
+CS_BOTH         = 3
+
+# Register setup sent by Init(): (command, data, chip select target).
+# Every entry is one command byte followed by one data burst.
+INIT_SEQUENCE = (
+    (0x74, bytes((0xC0, 0x1C, 0x1C, 0xCC, 0xCC, 0xCC, 0x15, 0x15, 0x55)), CS_MASTER),
+    (0xF0, bytes((0x49, 0x55, 0x13, 0x5D, 0x05, 0x10)), CS_BOTH),
+    (0x00, bytes((0xDF, 0x69)), CS_BOTH),
+    (0x50, bytes((0xF7,)), CS_BOTH),
+    (0x60, bytes((0x03, 0x03)), CS_BOTH),
+    (0x86, bytes((0x10,)), CS_BOTH),
+    (0xE3, bytes((0x22,)), CS_BOTH),
+    (0xE0, bytes((0x01,)), CS_BOTH),
+    (0x61, bytes((0x04, 0xB0, 0x03, 0x20)), CS_BOTH),
+    (0x01, bytes((0x0F, 0x00, 0x28, 0x2C, 0x28, 0x38)), CS_MASTER),
+    (0xB6, bytes((0x07,)), CS_MASTER),
+    (0x06, bytes((0xE8, 0x28)), CS_MASTER),
+    (0xB7, bytes((0x01,)), CS_MASTER),
+    (0x05, bytes((0xE8, 0x28)), CS_MASTER),
+    (0xB0, bytes((0x01,)), CS_MASTER),
+    (0xB1, bytes((0x02,)), CS_MASTER),
+)
+
+class BusyTimeout(Exception):
+    # BUSY did not go high (idle) before the phase deadline
+    pass
+
+class PanelAborted(Exception):
+    # EPD.abort() was called while this thread was using the panel
+    pass
+
+class RefreshHandle():
+    # Panel refresh (PON, DRF, POF) running in a background thread, see EPD.start_refresh()
+    def __init__(self, target):
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(target,), name="epd-refresh", daemon=True)
+        self.thread.start()
+
+    def _run(self, target):
+        try:
+            target()
+        except Exception as e:
+            self.error = e
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def wait(self, timeout=None):
+        # Returns False if still running after timeout, re-raises refresh errors
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
 class EPD():
     def __init__(self):
         self.width = EPD_WIDTH
@@ -62,6 +140,16 @@ class EPD():
         self.EPD_BUSY_PIN  = epdconfig.EPD_BUSY_PIN
         self.EPD_PWR_PIN  = epdconfig.EPD_PWR_PIN
 
+        self.spi_stats = (0, 0)     # (calls, bytes) of the last refresh
+        self.init_timings = {}      # seconds per Init() step
+        self.busy_timings = []      # (phase, seconds) of every BUSY wait since Init()
+        self.busy_overruns = []     # (phase, seconds, "slow" or "timeout") since Init()
+        self.pending = None         # RefreshHandle of a refresh in progress
+        self.lock = threading.RLock()       # held by every SPI / BUSY sequence, see abort()
+        self.aborted = threading.Event()    # set by abort(), final
+        self.closed = False         # sleep() done, module_exit called
+        self.powered = False        # PON sent, POF not sent yet
+
         epdconfig.module_init_1()
 
     def Reset(self):
@@ -87,150 +175,146 @@ class EPD():
         epdconfig.spi_write_data_byte(Data)
 
     def SendData2(self, buf, Len):
+        # Every frame / clear transfer goes through here in rows or chunks
+        if self.aborted.is_set():
+            raise PanelAborted("transfer aborted")
         epdconfig.spi_writebyte2(buf, Len)
 
-    def ReadBusyH(self):
+    def ReadBusyH(self, phase="busy", timeout=None):
+        if timeout is None:
+            timeout = BUSY_DEADLINES.get(phase, BUSY_TIMEOUT)
         print("e-Paper busy H")
-        while(epdconfig.digital_read(self.EPD_BUSY_PIN) == 0):      # 0: busy, 1: idle
-            epdconfig.delay_ms(5)
-        print("e-Paper busy H release")
+        start = epdconfig.busy_clock()
+        while True:
+            remaining = timeout - (epdconfig.busy_clock() - start)
+            idle = remaining > 0 and epdconfig.wait_busy_high(min(remaining, ABORT_CHECK_S))  # 0: busy, 1: idle
+            # POF is the way out of an abort, it is never interrupted
+            if idle or remaining <= 0 or (phase != "pof" and self.aborted.is_set()):
+                break
+        elapsed = epdconfig.busy_clock() - start
+        self.busy_timings.append((phase, elapsed))
+        if not idle and remaining > 0:
+            print("e-Paper busy H aborted (%s: %.2f s)" % (phase, elapsed))
+            raise PanelAborted("BUSY %s wait aborted" % phase)
+        if not idle:
+            print("e-Paper busy H timeout (%s: %.2f s)" % (phase, elapsed))
+            self.busy_overruns.append((phase, elapsed, "timeout"))
+            raise BusyTimeout("BUSY %s not released within %d s" % (phase, timeout))
+
+        print("e-Paper busy H release (%s: %.2f s)" % (phase, elapsed))
+        expected = BUSY_EXPECTED.get(phase)
+        if expected is not None and elapsed > expected:
+            print("e-Paper busy H slow (%s: %.2f s, expected %.2f s)" % (phase, elapsed, expected))
+            self.busy_overruns.append((phase, elapsed, "slow"))
+        return idle
 
     def TurnOnDisplay(self):
-        print("Write PON")
-        self.CS_ALL(0)
-        self.SendCommand(0x04)
-        self.CS_ALL(1)
-        self.ReadBusyH()
-
-        epdconfig.delay_ms(50)
-
-        print("Write DRF")
-        self.CS_ALL(0)
-        self.SendCommand(0x12)
-        self.SendData(0x00)
-        self.CS_ALL(1)
-        self.ReadBusyH()
+        with self.lock:
+            done = False
+            try:
+                print("Write PON")
+                self.powered = True
+                self.CS_ALL(0)
+                self.SendCommand(0x04)
+                self.CS_ALL(1)
+                self.ReadBusyH("pon")
+
+                epdconfig.delay_ms(50)
+
+                print("Write DRF")
+                self.CS_ALL(0)
+                self.SendCommand(0x12)
+                self.SendData(0x00)
+                self.CS_ALL(1)
+                self.ReadBusyH("drf")
+                done = True
+            finally:
+                # POF also if PON or DRF hung or was aborted: the abort path
+                # (sleep) must not send deep sleep with the charge pumps still on
+                self.PowerOff(abort=not done)
+
+        self.spi_stats = epdconfig.spi_stats(reset=True)
+        print("SPI: %d calls, %d bytes" % self.spi_stats)
+        print("Display Done!!")
 
+    def PowerOff(self, abort=False):
+        # POF, bounded by its own deadline (BUSY_DEADLINES["pof"]). When
+        # aborting, a POF timeout is only reported: the original error is raised.
         print("Write POF")
         self.CS_ALL(0)
         self.SendCommand(0x02)
         self.SendData(0x00)
         self.CS_ALL(1)
-        print("Display Done!!")
+        self.powered = False
+        try:
+            self.ReadBusyH("pof")
+        except BusyTimeout as e:
+            if not abort:
+                raise
+            print(f"POF not confirmed: {e}")
+
+    def start_refresh(self):
+        # Non-blocking TurnOnDisplay(): the caller may render, read sensors etc.
+        # while the panel is busy. No SPI traffic is allowed until it is done,
+        # every method below which talks to the panel waits for it first.
+        self.wait_refresh()
+        self.pending = RefreshHandle(self.TurnOnDisplay)
+        return self.pending
+
+    def wait_refresh(self):
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            pending.wait()
+
+    def refresh(self, wait=True):
+        if wait:
+            self.TurnOnDisplay()
+            return None
+        return self.start_refresh()
+
+    def SendSequence(self, sequence):
+        for command, data, target in sequence:
+            if target == CS_MASTER:
+                epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
+            else:
+                self.CS_ALL(0)
+            self.SendCommand(command)
+            if data:
+                self.SendData2(data, len(data))
+            self.CS_ALL(1)
 
     def Init(self):
-        print("EPD init...")
-        epdconfig.module_init_2()
-
-        self.Reset() 
-        self.ReadBusyH()
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0x74)
-        self.SendData(0xC0)
-        self.SendData(0x1C)
-        self.SendData(0x1C)
-        self.SendData(0xCC)
-        self.SendData(0xCC)
-        self.SendData(0xCC)
-        self.SendData(0x15)
-        self.SendData(0x15)
-        self.SendData(0x55)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0xF0)
-        self.SendData(0x49)
-        self.SendData(0x55)
-        self.SendData(0x13)
-        self.SendData(0x5D)
-        self.SendData(0x05)
-        self.SendData(0x10)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0x00)
-        self.SendData(0xDF)
-        self.SendData(0x69)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0x50)
-        self.SendData(0xF7)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0x60)
-        self.SendData(0x03)
-        self.SendData(0x03)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0x86)
-        self.SendData(0x10)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0xE3)
-        self.SendData(0x22)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0xE0)
-        self.SendData(0x01)
-        self.CS_ALL(1)
-
-        self.CS_ALL(0)
-        self.SendCommand(0x61)
-        self.SendData(0x04)
-        self.SendData(0xB0)
-        self.SendData(0x03)
-        self.SendData(0x20)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0x01)
-        self.SendData(0x0F)
-        self.SendData(0x00)
-        self.SendData(0x28)
-        self.SendData(0x2C)
-        self.SendData(0x28)
-        self.SendData(0x38)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0xB6)
-        self.SendData(0x07)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0x06)
-        self.SendData(0xE8)
-        self.SendData(0x28)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0xB7)
-        self.SendData(0x01)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0x05)
-        self.SendData(0xE8)
-        self.SendData(0x28)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0xB0)
-        self.SendData(0x01)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0xB1)
-        self.SendData(0x02)
-        self.CS_ALL(1)
+        self.wait_refresh()
+        self.busy_timings = []
+        self.busy_overruns = []
+        with self.lock:
+            t0 = time.perf_counter()
+            epdconfig.module_init_2()
+            self.closed = False
+            print("EPD init... (BUSY backend: %s)" % epdconfig.busy_backend())
+
+            t1 = time.perf_counter()
+            self.Reset() 
+            t2 = time.perf_counter()
+            self.ReadBusyH("reset")
+
+            t3 = time.perf_counter()
+            self.SendSequence(INIT_SEQUENCE)
+            t4 = time.perf_counter()
+
+        self.init_timings = {"power": t1 - t0, "reset": t2 - t1, "busy": t3 - t2, "registers": t4 - t3}
+        print("EPD init: %.1f ms (power %.1f, reset %.1f, busy %.1f, registers %.1f)" % (
+            (t4 - t0) * 1000, (t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000, (t4 - t3) * 1000))
     
     def getbuffer(self, image):
+        # Images which already use the panel palette (BMP from convert.py)
+        # are mapped index -> nibble directly, without RGB round trip and dithering
+        codes = epdframe.panel_indices(image)
+        if codes is not None:
+            return epdframe.pack_indices(codes)
+
+        from PIL import Image     # quantization path only, see epdframe.py
+
         # Create a pallette with the 7 colors supported by the panel
         pal_image = Image.new("P", (1,1))
         pal_image.putpalette( (0,0,0,  255,255,255,  255,255,0,  255,0,0,  0,0,0,  0,0,255,  0,255,0) + (0,0,0)*249)
@@ -247,52 +331,170 @@ class EPD():
 
         # Convert the soruce image to the 7 colors, dithering if needed
         image_7color = image_temp.convert("RGB").quantize(palette=pal_image)
-        buf_7color = bytearray(image_7color.tobytes('raw'))
+        buf_7color = image_7color.tobytes('raw')
 
         # PIL does not support 4 bit color, so pack the 4 bits of color
-        # into a single byte to transfer to the panel
-        buf = [0x00] * int(self.width * self.height / 2)
-        idx = 0
-        for i in range(0, len(buf_7color), 2):
-            buf[idx] = (buf_7color[i] << 4) + buf_7color[i+1]
-            idx += 1
-            
-        return buf
+        # into a single byte to transfer to the panel (vectorized, see epdframe.py)
+        return epdframe.pack_indices(buf_7color)
     
-    def Clear(self, color=0x11):
-        clear_buf = [color] * int(self.width/2)
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0x10)
-        for i in range(self.height):
-            self.SendData2(clear_buf, int(self.width/2))
-        self.CS_ALL(1)
-        epdconfig.digital_write(self.EPD_CS_S_PIN, 0)
-        self.SendCommand(0x10)
-        for i in range(self.height):
-            self.SendData2(clear_buf, int(self.width/2))
-        self.CS_ALL(1)
-
-        self.TurnOnDisplay()
+    def write_clear(self, color=0x11, broadcast=CLEAR_BROADCAST):
+        self.wait_refresh()
+        with self.lock:
+            if broadcast:
+                # Both halves get identical data: assert both chip selects and
+                # fill the RAM of each controller (600 x 1600 px) with one transfer
+                self.CS_ALL(0)
+                self.SendCommand(0x10)
+                self.SendData2(bytes([color]) * (int(self.width/4) * self.height), None)
+                self.CS_ALL(1)
+                return
+
+            clear_buf = bytes([color]) * int(self.width/2)
+            epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
+            self.SendCommand(0x10)
+            for i in range(self.height):
+                self.SendData2(clear_buf, int(self.width/2))
+            self.CS_ALL(1)
+            epdconfig.digital_write(self.EPD_CS_S_PIN, 0)
+            self.SendCommand(0x10)
+            for i in range(self.height):
+                self.SendData2(clear_buf, int(self.width/2))
+            self.CS_ALL(1)
+
+    def Clear(self, color=0x11, broadcast=CLEAR_BROADCAST, wait=True):
+        self.write_clear(color, broadcast)
+        return self.refresh(wait)
 
     def display(self, image):
         Width =int(self.width / 4)
         Width1 =int(self.width / 2)
 
-        epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
-        self.SendCommand(0x10)
-        for i in range(self.height):
-            self.SendData2(image[i * Width1 : i * Width1+Width], Width)
-        self.CS_ALL(1)
-
-        epdconfig.digital_write(self.EPD_CS_S_PIN, 0)
-        self.SendCommand(0x10)
-        for i in range(self.height):
-            self.SendData2(image[i * Width1+Width : i * Width1+Width1], Width)
-        self.CS_ALL(1)
+        # Row slices are memoryviews of the buffer, not copies
+        if isinstance(image, list):
+            image = bytearray(image)
+        image = memoryview(image).cast("B")
+
+        self.wait_refresh()
+        with self.lock:
+            epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
+            self.SendCommand(0x10)
+            for i in range(self.height):
+                self.SendData2(image[i * Width1 : i * Width1+Width], Width)
+            self.CS_ALL(1)
+
+            epdconfig.digital_write(self.EPD_CS_S_PIN, 0)
+            self.SendCommand(0x10)
+            for i in range(self.height):
+                self.SendData2(image[i * Width1+Width : i * Width1+Width1], Width)
+            self.CS_ALL(1)
 
         self.TurnOnDisplay()
 
+    def display_frame(self, master, slave, wait=True):
+        # Pre-packed frame (epdframe.load_frame): the controller streams are
+        # already rotated and split, so each one is sent as a single write
+        self.wait_refresh()
+        with self.lock:
+            epdconfig.digital_write(self.EPD_CS_M_PIN, 0)
+            self.SendCommand(0x10)
+            self.SendData2(master, len(master))
+            self.CS_ALL(1)
+
+            epdconfig.digital_write(self.EPD_CS_S_PIN, 0)
+            self.SendCommand(0x10)
+            self.SendData2(slave, len(slave))
+            self.CS_ALL(1)
+
+        return self.refresh(wait)
+
+    def display_stream(self, master_chunks, slave_chunks, depth=STREAM_DEPTH, wait=True):
+        # Chunks are produced (packed) in a worker thread while
+        # the previous ones are on the SPI bus. The bounded queue keeps only
+        # a few chunks in memory instead of the whole 960 KB frame.
+        self.wait_refresh()
+        chunks = queue.Queue(maxsize=depth)
+        stop = threading.Event()    # set when the consumer is done, also on errors
+
+        def put(item):
+            # False once the transfer has stopped: the producer returns and
+            # does not block forever on a queue nobody reads
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=STREAM_PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def producer():
+            try:
+                for pin, source in ((self.EPD_CS_M_PIN, master_chunks), (self.EPD_CS_S_PIN, slave_chunks)):
+                    for chunk in source:
+                        if not put((pin, chunk)):
+                            return
+                put(None)
+            except Exception as e:
+                put(e)
+
+        worker = threading.Thread(target=producer, name="epd-stream", daemon=True)
+        worker.start()
+
+        try:
+            with self.lock:
+                selected = None
+                try:
+                    while True:
+                        item = chunks.get()
+                        if item is None:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+
+                        pin, chunk = item
+                        if pin != selected:
+                            self.CS_ALL(1)
+                            epdconfig.digital_write(pin, 0)
+                            self.SendCommand(0x10)
+                            selected = pin
+                        self.SendData2(chunk, len(chunk))
+                finally:
+                    self.CS_ALL(1)
+        finally:
+            # Unblock a producer waiting in put() and release its chunks
+            stop.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+            worker.join()
+
+        return self.refresh(wait)
+
+    def prepare_image(self, image):
+        # Panel palette images are mapped to panel codes now and packed chunk
+        # by chunk while streaming, anything else goes through getbuffer
+        # (quantization). No SPI traffic, safe while a refresh is running.
+        codes = epdframe.panel_indices(image)
+        if codes is None:
+            master, slave = epdframe.split_halves(self.getbuffer(image))
+            return [master], [slave]
+        return epdframe.iter_code_chunks(codes, 0), epdframe.iter_code_chunks(codes, 1)
+
+    def display_image(self, image, wait=True):
+        return self.display_stream(*self.prepare_image(image), wait=wait)
+
     def sleep(self):
+        try:
+            self.wait_refresh()
+        except Exception as e:
+            print(f"Refresh error: {e}")
+
+        with self.lock:
+            self.deep_sleep()
+
+    def deep_sleep(self):
+        # Caller holds self.lock. Only once per Init(): after an abort the
+        # owner's error path and the watchdog both end up here.
+        if self.closed:
+            return
         self.CS_ALL(0)
         self.SendCommand(0x07)
         self.SendData(0XA5)
@@ -300,8 +502,34 @@ class EPD():
 
         time.sleep(0.2)
         epdconfig.module_exit()
+        self.closed = True
+
+    def abort(self, timeout=ABORT_LOCK_TIMEOUT):
+        # Last resort (refresh watchdog), called from another thread. The
+        # thread using the panel stops at its next BUSY check or data write
+        # (PanelAborted), sends POF and releases the lock; then POF and deep
+        # sleep are sent here unless that thread already did. Returns False
+        # if the panel is still in use after timeout (nothing sent).
+        self.aborted.set()
+        if not self.lock.acquire(timeout=timeout):
+            print(f"Panel still in use after {timeout} s, POF / deep sleep skipped")
+            return False
+        try:
+            if self.powered:
+                try:
+                    self.PowerOff(abort=True)
+                except Exception as e:
+                    print(f"POF failed: {e}")
+            self.deep_sleep()
+        finally:
+            self.lock.release()
+        return True
 
     def shutdown(self):
+        if epdconfig.EPD_BACKEND == "emu":
+            print("Emulated panel, shutdown skipped")
+            return
+
         # Only root can do this
         if os.getuid() != 0:
             print("ERROR: Script must be run with 'sudo' to perform emergency shutdown.")
@@ -3,6 +3,15 @@
 # * | Function    :   Hardware underlying interface
 # * | Info        :
 # *----------------
+# * |	This version:   V1.2
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Zero-copy spi_writebyte2 (bytes, bytearray, memoryview, NumPy), SPI counters
+# * |             :   Pluggable BUSY wait backend (GPIO character device edge events)
+# * |             :   Software panel emulator backend (EPD_BACKEND=emu, see epdemu.py)
+# * |             :   BUSY waits timed with the clock of the BUSY backend (busy_clock)
+# * |             :   module_exit releases the BUSY line request
+# *----------------
 # * |	This version:   V1.1
 # * | Author      :   adam_aph
 # * | Date        :   2026-01-21
@@ -33,8 +42,6 @@
 # THE SOFTWARE.
 #
 import time
-import RPi.GPIO as GPIO
-import spidev
 import os
 
 # ==============================
@@ -52,10 +59,142 @@ EPD_PWR_PIN   = 18    # Power control (Physical 12)
 MT_SWITCH_PIN = 26    # Maintenance Switch (Physical 37)
 MT_LED_PIN    = 6     # Maintenance LED (Physical 31)
 
+# ==============================
+# HARDWARE BACKEND
+# ==============================
+# "hw":  RPi.GPIO + spidev (the real HAT)
+# "emu": epdemu.py, decodes the command stream into a frame on any Linux box
+EPD_BACKEND = os.environ.get("EPD_BACKEND", "hw")
+
+if EPD_BACKEND == "emu":
+    import epdemu
+    GPIO, spidev = epdemu.attach(EPD_CS_M_PIN, EPD_CS_S_PIN, EPD_DC_PIN,
+                                 EPD_RST_PIN, EPD_BUSY_PIN, MT_SWITCH_PIN)
+else:
+    import RPi.GPIO as GPIO
+    import spidev
+
+# ==============================
+# BUSY WAIT BACKEND
+# ==============================
+# "gpiod": block in the kernel on the BUSY rising edge (GPIO character device),
+#          the CPU can idle for the whole refresh
+# "poll":  RPi.GPIO read every BUSY_POLL_MS
+# "auto":  gpiod when the python3-libgpiod bindings are available, else poll
+GPIO_BACKEND  = "auto"
+GPIO_CHIP     = "/dev/gpiochip0"
+BUSY_POLL_MS  = 5
+BUSY_EDGE_SLICE = 1.0   # max seconds blocked per edge wait, then re-check the level
+
+
+class PollBusy:
+    name = "poll"
+
+    def __init__(self, pin):
+        self.pin = pin
+
+    def clock(self):
+        return time.monotonic()
+
+    def wait_high(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while GPIO.input(self.pin) == 0:      # 0: busy, 1: idle
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(BUSY_POLL_MS / 1000.0)
+        return True
+
+    def close(self):
+        pass
+
+
+class EdgeBusy:
+    """Common wait loop of the edge event backends. The level is checked
+    after every event, so stale events queued before the command only cause
+    a re-check and a missed edge is caught after BUSY_EDGE_SLICE."""
+
+    def clock(self):
+        return time.monotonic()
+
+    def wait_high(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.level():
+            remaining = BUSY_EDGE_SLICE if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.wait_edge(min(remaining, BUSY_EDGE_SLICE))
+        return True
+
+
+class GpiodBusy(EdgeBusy):
+    """libgpiod v2 Python bindings."""
+    name = "gpiod"
+
+    def __init__(self, pin):
+        import gpiod
+        from gpiod.line import Direction, Edge, Value
+        self.pin = pin
+        self.active = Value.ACTIVE
+        self.request = gpiod.request_lines(
+            GPIO_CHIP, consumer="epd-busy",
+            config={pin: gpiod.LineSettings(direction=Direction.INPUT, edge_detection=Edge.RISING)})
+
+    def level(self):
+        return self.request.get_value(self.pin) == self.active
+
+    def wait_edge(self, timeout):
+        if self.request.wait_edge_events(timeout):
+            self.request.read_edge_events()
+
+    def close(self):
+        self.request.release()
+
+
+class GpiodV1Busy(EdgeBusy):
+    """libgpiod v1 Python bindings (python3-libgpiod on Raspberry Pi OS Bookworm)."""
+    name = "gpiod-v1"
+
+    def __init__(self, pin):
+        import gpiod
+        self.chip = gpiod.Chip(GPIO_CHIP)
+        self.line = self.chip.get_line(pin)
+        self.line.request(consumer="epd-busy", type=gpiod.LINE_REQ_EV_RISING_EDGE)
+
+    def level(self):
+        return self.line.get_value() == 1
+
+    def wait_edge(self, timeout):
+        sec = int(timeout)
+        if self.line.event_wait(sec=sec, nsec=int((timeout - sec) * 1e9)):
+            self.line.event_read()
+
+    def close(self):
+        self.line.release()
+        self.chip.close()
+
+
+def make_busy_backend(pin, backend=GPIO_BACKEND):
+    if EPD_BACKEND == "emu":
+        return epdemu.EmuBusy(pin)
+    if backend in ("auto", "gpiod"):
+        try:
+            import gpiod
+            if hasattr(gpiod, "request_lines"):
+                return GpiodBusy(pin)
+            return GpiodV1Busy(pin)
+        except Exception as e:
+            if backend == "gpiod":
+                raise
+            print(f"Warning: gpiod BUSY backend unavailable ({e}), polling")
+    return PollBusy(pin)
+
 
 class EPDConfig:
     def __init__(self):
         self.spi = spidev.SpiDev()
+        self.spi_calls = 0
+        self.spi_bytes = 0
+        self.busy = None
         
     def digital_write(self, pin, value):
         GPIO.output(pin, GPIO.HIGH if value else GPIO.LOW)
@@ -66,12 +205,25 @@ class EPDConfig:
     def delay_ms(self, ms):
         time.sleep(ms / 1000.0)
 
+    def wait_busy_high(self, timeout=None):
+        """Waits until BUSY is high (idle). Returns False if timeout (s) expired."""
+        return self.busy.wait_high(timeout)
+
+    def busy_clock(self):
+        """Seconds on the clock of the BUSY backend (simulated time for the emulator)."""
+        return self.busy.clock()
+
+    def busy_backend(self):
+        return self.busy.name
+
     def spi_write_cmd_byte(self, data):
         """Used for Commands (DC Low)"""
         self.digital_write(EPD_DC_PIN, 0)
         time.sleep(0.000001)  # 1μs setup time
         # Hardware SPI handles the transfer
         self.spi.writebytes([data])
+        self.spi_calls += 1
+        self.spi_bytes += 1
 
     def spi_write_data_byte(self, data):
         """Used for Data (DC High)."""
@@ -79,18 +231,38 @@ class EPDConfig:
         time.sleep(0.000001)  # 1μs setup time
         # Hardware SPI handles the transfer
         self.spi.writebytes([data])
+        self.spi_calls += 1
+        self.spi_bytes += 1
 
     def spi_writebyte2(self, buf, length=None):
-        """Used for Data (DC High). Optimized for large buffers."""
+        """Used for Data (DC High). Optimized for large buffers.
+        Accepts list, bytes, bytearray, memoryview or NumPy uint8 array;
+        anything but a list is passed to spidev without copying."""
         self.digital_write(EPD_DC_PIN, 1)
         time.sleep(0.000001)  # 1μs setup time
         if isinstance(buf, list):
             buf = bytearray(buf)
-        # Use memoryview to avoid slicing/copying large bytearrays
-        self.spi.writebytes2(memoryview(buf)[:length] if length else memoryview(buf))
+        view = memoryview(buf)
+        if not view.c_contiguous:
+            view = memoryview(view.tobytes())  # strided NumPy slice, one copy
+        view = view.cast("B")
+        # Use memoryview to avoid slicing/copying large buffers
+        if length is not None:
+            view = view[:length]
+        self.spi.writebytes2(view)
+        self.spi_calls += 1
+        self.spi_bytes += len(view)
         # Ensure SPI transfer completes
         time.sleep(0.000005)  # 5µs safety margin
 
+    def spi_stats(self, reset=False):
+        """Returns (calls, bytes) sent over SPI since the last reset."""
+        stats = (self.spi_calls, self.spi_bytes)
+        if reset:
+            self.spi_calls = 0
+            self.spi_bytes = 0
+        return stats
+
     def check_if_maintenance(self):
         if self.digital_read(MT_SWITCH_PIN) == GPIO.LOW:
             self.digital_write(MT_LED_PIN, 1)
@@ -116,6 +288,9 @@ class EPDConfig:
         GPIO.setup(MT_SWITCH_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
         GPIO.setup(MT_LED_PIN, GPIO.OUT, initial=GPIO.LOW)
 
+        if self.busy is None:
+            self.busy = make_busy_backend(EPD_BUSY_PIN)
+
         self.delay_ms(10)
         return 0
 
@@ -134,6 +309,10 @@ class EPDConfig:
         # self.spi.threewire = False  # Full duplex
         # self.spi.loop = False       # No loopback
 
+        # module_exit released the BUSY line: request it again for EPD.Init() after sleep()
+        if self.busy is None:
+            self.busy = make_busy_backend(EPD_BUSY_PIN)
+
         # Power up the display
         self.digital_write(EPD_PWR_PIN, 1)
 
@@ -167,6 +346,14 @@ class EPDConfig:
             except:
                 pass
 
+        # Release the BUSY line request (gpiod), module_init_2 requests it again
+        if self.busy is not None:
+            try:
+                self.busy.close()
+            except Exception as e:
+                print(f"BUSY release error: {e}")
+            self.busy = None
+
 # Export functions for epd12in48.py compatibility
 config = EPDConfig()
 digital_write = config.digital_write
@@ -175,6 +362,10 @@ delay_ms = config.delay_ms
 spi_write_cmd_byte = config.spi_write_cmd_byte
 spi_write_data_byte = config.spi_write_data_byte
 spi_writebyte2 = config.spi_writebyte2
+spi_stats = config.spi_stats
+wait_busy_high = config.wait_busy_high
+busy_clock = config.busy_clock
+busy_backend = config.busy_backend
 module_init_1 = config.module_init_1
 module_init_2 = config.module_init_2
 module_exit = config.module_exit
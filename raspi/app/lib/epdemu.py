@@ -0,0 +1,282 @@
+# /*****************************************************************************
+# * | File        :   epdemu.py
+# * | Function    :   Software emulator of the 13.3" Spectra 6 panel (HAT)
+# * | Info        :   Drop-in GPIO / spidev replacement for epdconfig.py,
+# * |             :   selected with EPD_BACKEND=emu in the environment
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# The emulator decodes the SPI command stream of both controllers (chip
+# select + DC line), keeps their RAM, latches it on DRF and simulates BUSY.
+# BUSY periods and SPI transfer time are not slept, they are added to a
+# simulated clock, so a full Init / Clear / display cycle runs in a fraction
+# of a second and still reports the wall time the real panel would take.
+#
+# Environment:
+#   EPD_EMU_PNG          write the displayed frame to this PNG after every DRF
+#   EPD_EMU_MAINTENANCE  1 = maintenance switch closed
+#   EPD_EMU_QUIET        1 = no report at exit
+#   EPD_EMU_SLOW         factor applied to the BUSY durations (cold panel)
+#   EPD_EMU_HANG         BUSY never ends after this phase: reset, pon, drf or pof
+
+import os
+import time
+import atexit
+import epdframe
+
+# Simulated BUSY durations in seconds (measured order of magnitude)
+RESET_S = 0.02
+PON_S   = 0.2
+DRF_S   = 19.0
+POF_S   = 0.05
+
+SPI_BUFSIZ = 65536   # spidev.bufsiz from cmdline.txt, one ioctl per chunk
+
+
+class Controller:
+    def __init__(self, name):
+        self.name = name
+        self.ram = bytearray(epdframe.HALF_BYTES)
+        self.shown = bytes(epdframe.HALF_BYTES)
+        self.command = None
+        self.ptr = 0
+        self.overflow = 0
+        self.registers = {}
+
+    def command_byte(self, command):
+        self.command = command
+        self.registers[command] = bytearray()
+        if command == 0x10:
+            self.ptr = 0
+
+    def data(self, buf):
+        if self.command == 0x10:
+            n = max(0, min(len(buf), epdframe.HALF_BYTES - self.ptr))
+            self.ram[self.ptr:self.ptr + n] = buf[:n]
+            self.ptr += len(buf)
+            self.overflow += len(buf) - n
+        elif self.command is not None:
+            self.registers[self.command] += buf
+
+
+class Panel:
+    def __init__(self):
+        self.pins = {}
+        self.master = Controller("master")
+        self.slave = Controller("slave")
+        self.start = time.monotonic()
+        self.offset = 0.0           # simulated time not actually slept
+        self.busy_until = 0.0
+        self.powered = False
+        self.speed_hz = 4000000
+        self.stats = {"spi_calls": 0, "spi_syscalls": 0, "spi_bytes": 0, "gpio_writes": 0,
+                      "commands": 0, "refreshes": 0, "busy_s": 0.0, "spi_s": 0.0}
+        self.cs_m_pin = self.cs_s_pin = self.dc_pin = self.rst_pin = self.busy_pin = self.mt_pin = None
+
+    def now(self):
+        return time.monotonic() - self.start + self.offset
+
+    def set_busy(self, seconds, phase):
+        if os.environ.get("EPD_EMU_HANG") == phase:
+            seconds = float("inf")
+        seconds *= float(os.environ.get("EPD_EMU_SLOW", "1"))
+        self.busy_until = max(self.busy_until, self.now()) + seconds
+
+    def selected(self):
+        return [c for c, pin in ((self.master, self.cs_m_pin), (self.slave, self.cs_s_pin))
+                if self.pins.get(pin, 1) == 0]
+
+    # --- GPIO ---
+    def output(self, pin, value):
+        self.stats["gpio_writes"] += 1
+        old = self.pins.get(pin)
+        self.pins[pin] = 1 if value else 0
+        if pin == self.rst_pin and old == 0 and value:
+            self.set_busy(RESET_S, "reset")
+
+    def input(self, pin):
+        if pin == self.busy_pin:
+            return 1 if self.now() >= self.busy_until else 0      # 0: busy, 1: idle
+        if pin == self.mt_pin:
+            return 0 if os.environ.get("EPD_EMU_MAINTENANCE") == "1" else 1
+        return self.pins.get(pin, 0)
+
+    # --- SPI ---
+    def write(self, buf, syscalls):
+        buf = bytes(buf)
+        self.stats["spi_calls"] += 1
+        self.stats["spi_syscalls"] += syscalls
+        self.stats["spi_bytes"] += len(buf)
+        spi_s = len(buf) * 8 / self.speed_hz
+        self.stats["spi_s"] += spi_s
+        self.offset += spi_s
+
+        targets = self.selected()
+        if self.pins.get(self.dc_pin, 1) == 0:
+            for command in buf:
+                self.command(command, targets)
+        else:
+            for c in targets:
+                c.data(buf)
+
+    def command(self, command, targets):
+        self.stats["commands"] += 1
+        for c in targets:
+            c.command_byte(command)
+
+        if command == 0x04:         # PON
+            self.powered = True
+            self.set_busy(PON_S, "pon")
+        elif command == 0x12:       # DRF
+            if not self.powered:
+                print("EPD emulator: DRF without PON")
+            for c in targets:
+                c.shown = bytes(c.ram)
+            self.stats["refreshes"] += 1
+            self.set_busy(DRF_S, "drf")
+            png = os.environ.get("EPD_EMU_PNG")
+            if png:
+                self.save_png(png)
+        elif command == 0x02:       # POF
+            self.powered = False
+            self.set_busy(POF_S, "pof")
+
+    def wait_busy(self, timeout):
+        remaining = self.busy_until - self.now()
+        if remaining <= 0:
+            return True
+        if timeout is not None and remaining > timeout:
+            self.offset += timeout
+            self.stats["busy_s"] += timeout
+            return False
+        self.offset += remaining
+        self.stats["busy_s"] += remaining
+        return True
+
+    # --- results ---
+    def frame(self):
+        """Returns the displayed (master, slave) controller streams."""
+        return self.master.shown, self.slave.shown
+
+    def image(self):
+        return epdframe.frame_to_image(*self.frame())
+
+    def save_png(self, path):
+        self.image().save(path, format="PNG")
+
+    def report(self):
+        stats = dict(self.stats)
+        stats["overflow_bytes"] = self.master.overflow + self.slave.overflow
+        stats["sim_time_s"] = round(self.now(), 3)
+        stats["busy_pending"] = self.now() < self.busy_until
+        stats["busy_s"] = round(stats["busy_s"], 3)
+        stats["spi_s"] = round(stats["spi_s"], 3)
+        return stats
+
+
+panel = Panel()
+
+
+class GPIO:
+    # RPi.GPIO subset used by epdconfig.py
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_UP = 22
+
+    @staticmethod
+    def setmode(mode):
+        pass
+
+    @staticmethod
+    def setwarnings(flag):
+        pass
+
+    @staticmethod
+    def setup(pin, direction, initial=None, pull_up_down=None):
+        if initial is not None:
+            panel.pins[pin] = initial
+
+    @staticmethod
+    def output(pin, value):
+        panel.output(pin, value)
+
+    @staticmethod
+    def input(pin):
+        return panel.input(pin)
+
+
+class SpiDev:
+    # spidev.SpiDev subset used by epdconfig.py
+    def __init__(self):
+        self.mode = 0
+        self.bits_per_word = 8
+        self.lsbfirst = False
+        self.no_cs = False
+        self.max_speed_hz = panel.speed_hz
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == "max_speed_hz":
+            panel.speed_hz = value
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def writebytes(self, data):
+        panel.write(data, 1)
+
+    def writebytes2(self, data):
+        n = len(memoryview(data).cast("B")) if not isinstance(data, list) else len(data)
+        panel.write(data, max(1, -(-n // SPI_BUFSIZ)))
+
+
+class spidev:
+    SpiDev = SpiDev
+
+
+class EmuBusy:
+    # BUSY wait backend for epdconfig.make_busy_backend(), advances the simulated clock
+    name = "emu"
+
+    def __init__(self, pin):
+        self.pin = pin
+
+    def wait_high(self, timeout):
+        return panel.wait_busy(timeout)
+
+    def clock(self):
+        # simulated: a BUSY wait measures the time the real panel would take
+        return panel.now()
+
+    def close(self):
+        pass
+
+
+def attach(cs_m, cs_s, dc, rst, busy, mt_switch):
+    """Called by epdconfig.py with its pin assignments, returns (GPIO, spidev)."""
+    panel.cs_m_pin, panel.cs_s_pin, panel.dc_pin = cs_m, cs_s, dc
+    panel.rst_pin, panel.busy_pin, panel.mt_pin = rst, busy, mt_switch
+    return GPIO, spidev
+
+
+def report():
+    return panel.report()
+
+
+def _print_report():
+    if os.environ.get("EPD_EMU_QUIET") != "1":
+        print("EPD emulator:", report())
+
+atexit.register(_print_report)
+
+### END OF FILE ###
@@ -0,0 +1,468 @@
+# /*****************************************************************************
+# * | File        :   epdframe.py
+# * | Function    :   Frame buffer helpers for the 13.3" Spectra 6 panel
+# * | Info        :   Pure NumPy code, no GPIO/SPI access, safe to import on a PC
+# *----------------
+# * | This version:   V1.7
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Frame header for halves written as they are (look-ahead frames)
+# *----------------
+# * | This version:   V1.6
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Overlays merged into the packed controller streams
+# *----------------
+# * | This version:   V1.5
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   NumPy / PIL imported on first use (raw .e6 path needs neither)
+# *----------------
+# * | This version:   V1.4
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Row-chunk iterators for streamed SPI transfer
+# *----------------
+# * | This version:   V1.3
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Optional frame compression (RLE / zlib)
+# *----------------
+# * | This version:   V1.2
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Pre-packed panel-native frame format (.e6)
+# *----------------
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Direct palette-index path (no RGB round trip / re-dither)
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release (vectorized 4bpp nibble packing)
+# ******************************************************************************/
+
+import mmap
+import struct
+import zlib
+
+# NumPy and PIL are imported by the functions which need them: sending a raw
+# .e6 frame (parse_frame, load_frame) must not pay for their import at boot.
+
+PANEL_W = 1200      # panel native width (portrait)
+PANEL_H = 1600      # panel native height (portrait)
+
+ROW_BYTES = PANEL_W // 2            # two pixels per byte
+HALF_ROW_BYTES = ROW_BYTES // 2     # master / slave controller part of a row
+FRAME_BYTES = ROW_BYTES * PANEL_H   # 960 000 bytes
+HALF_BYTES = FRAME_BYTES // 2       # 480 000 bytes per controller
+
+# Pre-packed frame file (.e6):
+#   header (32 bytes) | master half (HALF_BYTES) | slave half (HALF_BYTES)
+# Each half is the exact byte stream sent after command 0x10 to its controller,
+# i.e. the panel rotation and the row split are already applied.
+FRAME_EXT = ".e6"
+FRAME_MAGIC = b"E6FR"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<4sBBHHII14x")  # magic, version, flags, w, h, master len, slave len
+
+# Optional compression of both halves, stored in the header flags.
+# A frame which would not get smaller is always stored raw.
+CODEC_RAW = 0
+CODEC_RLE = 1       # byte runs of the packed stream, decoded with np.repeat
+CODEC_ZLIB = 2      # deflate, C decoder from the standard library
+CODEC_MASK = 0x0F
+CODECS = {"raw": CODEC_RAW, "rle": CODEC_RLE, "zlib": CODEC_ZLIB}
+
+RLE_MAX_RUN = 0xFFFF
+
+# Streamed transfer: rows per chunk, 100 rows = 30 000 bytes per controller,
+# below spidev.bufsiz (cmdline.txt), so every chunk is a single SPI transfer
+STREAM_ROWS = 100
+
+# Panel palette, the same which is used by original Waveshare library.
+# Position in the palette is the 4 bit code sent to the panel (4 is unused).
+PANEL_PALETTE = (
+    0, 0, 0,        # 0 Black
+    255, 255, 255,  # 1 White
+    255, 255, 0,    # 2 Yellow
+    255, 0, 0,      # 3 Red
+    0, 0, 0,        # 4 (unused, black)
+    0, 0, 255,      # 5 Blue
+    0, 255, 0,      # 6 Green
+)
+
+# RGB -> panel code (duplicated black resolves to 0, as PIL quantize does)
+PANEL_CODES = {
+    (0, 0, 0): 0x0,
+    (255, 255, 255): 0x1,
+    (255, 255, 0): 0x2,
+    (255, 0, 0): 0x3,
+    (0, 0, 255): 0x5,
+    (0, 255, 0): 0x6,
+}
+
+NO_CODE = 0xFF  # palette entry which is not a panel color
+
+# Overlays (pack_overlay, overlay_frame) are merged into a packed frame as
+#   frame byte & keep | data
+# keep has 0xF in every nibble where the frame pixel shows through, so the
+# rows of the frame under the overlay are never unpacked to panel codes.
+
+
+def pack_indices(indices):
+    """
+    Packs panel color indices (one per byte, values 0..15) into the
+    4bpp stream expected by the panel: high nibble = left pixel.
+
+    Args:
+        indices: bytes-like object or NumPy array with an even number of items
+
+    Returns:
+        bytes: packed frame, len(indices) / 2 bytes long
+    """
+    import numpy as np
+    arr = np.frombuffer(indices, dtype=np.uint8) if not isinstance(indices, np.ndarray) \
+        else indices.reshape(-1)
+    if arr.size % 2:
+        raise ValueError(f"Odd number of pixels: {arr.size}")
+
+    packed = (arr[0::2] << 4) | (arr[1::2] & 0x0F)
+    return packed.astype(np.uint8, copy=False).tobytes()
+
+
+def palette_lut(image):
+    """
+    Builds a 256 entry lookup table: image palette index -> panel code.
+    Entries whose color is not one of the panel colors are set to NO_CODE.
+
+    Returns:
+        np.ndarray (uint8, 256) or None if the image is not a "P" image
+    """
+    import numpy as np
+    if image.mode != "P":
+        return None
+
+    palette = image.getpalette() or []
+    lut = np.full(256, NO_CODE, dtype=np.uint8)
+    for i in range(min(len(palette) // 3, 256)):
+        rgb = tuple(palette[i * 3:i * 3 + 3])
+        lut[i] = PANEL_CODES.get(rgb, NO_CODE)
+    return lut
+
+
+def panel_indices(image):
+    """
+    Maps a "P" image which already uses the panel palette (e.g. BMP from
+    tools/convert.py composited by refresh.py) straight to panel codes.
+    Landscape images are rotated on the index array, no RGB conversion and
+    no re-quantization takes place, so pixels are never shifted by dithering.
+
+    Returns:
+        np.ndarray (uint8, PANEL_H x PANEL_W) or None if the image has a
+        different size, is not a "P" image, or uses any non-panel color
+        (the caller must fall back to quantization then)
+    """
+    import numpy as np
+    lut = palette_lut(image)
+    if lut is None:
+        return None
+
+    if image.size == (PANEL_W, PANEL_H):
+        rotate = False
+    elif image.size == (PANEL_H, PANEL_W):
+        rotate = True
+    else:
+        return None
+
+    arr = np.asarray(image, dtype=np.uint8)
+
+    # Every palette entry used by the image must be a panel color
+    used = np.flatnonzero(np.bincount(arr.reshape(-1), minlength=256))
+    if (lut[used] == NO_CODE).any():
+        return None
+
+    codes = lut[arr]
+    if rotate:
+        # Same as image.rotate(90, expand=True) - counter-clockwise
+        codes = np.rot90(codes)
+    return codes
+
+
+def split_halves(packed):
+    """
+    Splits a packed frame (ROW_BYTES per row) into the master and slave
+    controller streams: left half of every row goes to the master.
+
+    Returns:
+        (bytes, bytes): master stream, slave stream
+    """
+    import numpy as np
+    rows = np.frombuffer(packed, dtype=np.uint8).reshape(PANEL_H, ROW_BYTES)
+    return rows[:, :HALF_ROW_BYTES].tobytes(), rows[:, HALF_ROW_BYTES:].tobytes()
+
+
+def join_halves(master, slave):
+    """
+    Inverse of split_halves().
+
+    Returns:
+        np.ndarray (uint8, PANEL_H x ROW_BYTES): packed frame rows
+    """
+    import numpy as np
+    m = np.frombuffer(master, dtype=np.uint8).reshape(PANEL_H, HALF_ROW_BYTES)
+    s = np.frombuffer(slave, dtype=np.uint8).reshape(PANEL_H, HALF_ROW_BYTES)
+    return np.hstack((m, s))
+
+
+def unpack_indices(packed):
+    """
+    Inverse of pack_indices(): one panel code per byte.
+
+    Returns:
+        np.ndarray (uint8) with 2 * len(packed) items, same leading shape
+    """
+    import numpy as np
+    arr = np.asarray(packed, dtype=np.uint8) if isinstance(packed, np.ndarray) \
+        else np.frombuffer(packed, dtype=np.uint8)
+    codes = np.empty(arr.shape[:-1] + (arr.shape[-1] * 2,), dtype=np.uint8)
+    codes[..., 0::2] = arr >> 4
+    codes[..., 1::2] = arr & 0x0F
+    return codes
+
+
+def rle_encode(data):
+    """
+    Run-length encodes a byte stream: run count (u32), then all run values
+    (u8), then all run lengths (u16). Runs longer than RLE_MAX_RUN are split.
+    """
+    import numpy as np
+    arr = np.frombuffer(data, dtype=np.uint8)
+    starts = np.flatnonzero(np.concatenate(([True], arr[1:] != arr[:-1])))
+    lengths = np.diff(np.append(starts, arr.size))
+
+    pieces = (lengths + RLE_MAX_RUN - 1) // RLE_MAX_RUN
+    values = np.repeat(arr[starts], pieces)
+    runs = np.full(values.size, RLE_MAX_RUN, dtype=np.int64)
+    runs[np.cumsum(pieces) - 1] = lengths - RLE_MAX_RUN * (pieces - 1)
+
+    return struct.pack("<I", values.size) + values.tobytes() + runs.astype("<u2").tobytes()
+
+
+def rle_decode(data):
+    """
+    Inverse of rle_encode().
+
+    Returns:
+        np.ndarray (uint8): decoded stream
+    """
+    import numpy as np
+    (count,) = struct.unpack_from("<I", data, 0)
+    values = np.frombuffer(data, dtype=np.uint8, count=count, offset=4)
+    runs = np.frombuffer(data, dtype="<u2", count=count, offset=4 + count)
+    return np.repeat(values, runs)
+
+
+def compress_half(codec, data):
+    if codec == CODEC_RLE:
+        return rle_encode(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 9)
+    return bytes(data)
+
+
+def decompress_half(codec, data, name="frame"):
+    """
+    Returns one decoded controller stream (HALF_BYTES long) as a memoryview.
+    """
+    if codec == CODEC_RAW:
+        out = data
+    elif codec == CODEC_RLE:
+        out = rle_decode(data)
+    elif codec == CODEC_ZLIB:
+        out = zlib.decompress(data, bufsize=HALF_BYTES)
+    else:
+        raise ValueError(f"Unknown frame codec {codec} in {name}")
+
+    out = memoryview(out).cast("B")
+    if len(out) != HALF_BYTES:
+        raise ValueError(f"Corrupted frame data in {name}")
+    return out
+
+
+def encode_frame(packed, codec=CODEC_RAW):
+    """
+    Serializes a packed frame (output of EPD.getbuffer / pack_indices)
+    into the pre-packed .e6 layout, optionally compressed.
+
+    Returns:
+        bytes: header + master half + slave half
+    """
+    if len(packed) != FRAME_BYTES:
+        raise ValueError(f"Invalid frame size: {len(packed)}, expected {FRAME_BYTES}")
+
+    master, slave = split_halves(packed)
+    if codec != CODEC_RAW:
+        c_master, c_slave = compress_half(codec, master), compress_half(codec, slave)
+        if len(c_master) + len(c_slave) < FRAME_BYTES:
+            master, slave = c_master, c_slave
+        else:
+            codec = CODEC_RAW
+
+    return frame_header(len(master), len(slave), codec) + master + slave
+
+
+def frame_header(master_len, slave_len, codec=CODEC_RAW):
+    """
+    Returns the .e6 header for halves of the given (stored) sizes.
+    """
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, codec, PANEL_W, PANEL_H, master_len, slave_len)
+
+
+def write_frame(path, packed, codec=CODEC_RAW):
+    """
+    Writes a packed frame as a pre-packed .e6 file.
+    """
+    with open(path, "wb") as f:
+        f.write(encode_frame(packed, codec))
+
+
+def parse_frame(buf, name="frame"):
+    """
+    Validates a pre-packed .e6 image held in memory (bytes, mmap, ...).
+    Raw frames are returned without copy, compressed ones are decoded.
+
+    Returns:
+        (memoryview, memoryview): master stream, slave stream
+    """
+    magic, version, flags, w, h, m_len, s_len = FRAME_HEADER.unpack_from(buf, 0)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError(f"Not a pre-packed frame: {name}")
+    if (w, h) != (PANEL_W, PANEL_H):
+        raise ValueError(f"Invalid frame geometry in {name}: {w} x {h}")
+
+    view = memoryview(buf)
+    start = FRAME_HEADER.size
+    if start + m_len + s_len > len(view):
+        raise ValueError(f"Truncated frame: {name}")
+
+    codec = flags & CODEC_MASK
+    master = decompress_half(codec, view[start:start + m_len], name)
+    slave = decompress_half(codec, view[start + m_len:start + m_len + s_len], name)
+    return master, slave
+
+
+def iter_code_chunks(codes, half, rows=STREAM_ROWS):
+    """
+    Packs one controller half of a panel code array (PANEL_H x PANEL_W,
+    see panel_indices) lazily, a few rows at a time.
+
+    Args:
+        codes: panel codes, one per byte
+        half: 0 = master (left columns), 1 = slave (right columns)
+
+    Yields:
+        bytes: packed chunk of rows * HALF_ROW_BYTES bytes
+    """
+    cols = slice(half * PANEL_W // 2, (half + 1) * PANEL_W // 2)
+    for r in range(0, PANEL_H, rows):
+        yield pack_indices(codes[r:r + rows, cols])
+
+
+def pack_overlay(codes, transparent=NO_CODE):
+    """
+    Pre-packs an overlay (rows x PANEL_W panel codes in panel orientation,
+    `transparent` where the frame shows through) for overlay_frame().
+
+    Returns:
+        (np.ndarray, np.ndarray): packed codes and keep mask (uint8, rows x ROW_BYTES)
+    """
+    import numpy as np
+    codes = np.asarray(codes, dtype=np.uint8)
+    if codes.ndim != 2 or codes.shape[1] != PANEL_W:
+        raise ValueError(f"Overlay must be {PANEL_W} pixels wide: {codes.shape}")
+
+    clear = codes == transparent
+    data = np.frombuffer(pack_indices(np.where(clear, 0, codes & 0x0F)), dtype=np.uint8)
+    keep = np.frombuffer(pack_indices(clear.astype(np.uint8) * 0x0F), dtype=np.uint8)
+    return data.reshape(-1, ROW_BYTES), keep.reshape(-1, ROW_BYTES)
+
+
+def overlay_frame(master, slave, overlays):
+    """
+    Merges overlays into a packed frame: only the bytes of the overlay rows
+    are read and written, all other rows are passed through as views of
+    master / slave (e.g. the mapped .e6 file).
+
+    Args:
+        master, slave: controller streams (parse_frame / load_frame)
+        overlays: [(first panel row, pack_overlay() result)], not overlapping
+
+    Returns:
+        ([chunks], [chunks]): master and slave chunks for EPD.display_stream()
+    """
+    import numpy as np
+    halves = []
+    for half, stream in enumerate((master, slave)):
+        view = memoryview(stream)
+        cols = slice(half * HALF_ROW_BYTES, (half + 1) * HALF_ROW_BYTES)
+        chunks = []
+        pos = 0
+        for row, (data, keep) in sorted(overlays, key=lambda o: o[0]):
+            start = row * HALF_ROW_BYTES
+            end = start + len(data) * HALF_ROW_BYTES
+            if start < pos or end > HALF_BYTES:
+                raise ValueError(f"Overlay rows {row}..{row + len(data) - 1} overlap or exceed the frame")
+            if start > pos:
+                chunks.append(view[pos:start])
+            rows = np.frombuffer(view[start:end], dtype=np.uint8).reshape(-1, HALF_ROW_BYTES)
+            chunks.append(((rows & keep[:, cols]) | data[:, cols]).tobytes())
+            pos = end
+        if pos < HALF_BYTES:
+            chunks.append(view[pos:HALF_BYTES])
+        halves.append(chunks)
+    return halves[0], halves[1]
+
+
+def load_frame(path):
+    """
+    Maps a pre-packed .e6 file read-only. Pages are populated up front, so
+    after EPD.lockit() (mlockall) the SPI transfer does not touch the SD card.
+
+    Returns:
+        (memoryview, memoryview): master stream, slave stream
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, flags=mmap.MAP_SHARED | getattr(mmap, "MAP_POPULATE", 0),
+                       prot=mmap.PROT_READ)
+    return parse_frame(mm, path)
+
+
+def frame_to_image(master, slave):
+    """
+    Rebuilds the landscape "P" image (panel palette) from controller streams,
+    for compositing on top of a pre-packed frame.
+    """
+    import numpy as np
+    from PIL import Image
+    codes = np.rot90(unpack_indices(join_halves(master, slave)), -1)
+    image = Image.frombytes("P", (PANEL_H, PANEL_W), codes.tobytes())
+    image.putpalette(PANEL_PALETTE + (0, 0, 0) * (256 - len(PANEL_PALETTE) // 3))
+    return image
+
+
+def pack_indices_loop(indices):
+    """
+    Reference implementation (original Waveshare loop), kept for
+    benchmarking and verification of pack_indices().
+    """
+    buf = [0x00] * (len(indices) // 2)
+    idx = 0
+    for i in range(0, len(indices), 2):
+        buf[idx] = (indices[i] << 4) + indices[i+1]
+        idx += 1
+    return buf
+
+### END OF FILE ###
@@ -0,0 +1,197 @@
+# /*****************************************************************************
+# * | File        :   glyphatlas.py
+# * | Function    :   Pre-rendered glyphs in panel codes for the margin texts
+# * | Info        :   Built by tools/build-atlas.py, no FreeType / PIL at runtime
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# Layout (little endian):
+#
+#   header        32 bytes   magic, version, style / glyph / kerning counts
+#   style table   count x 32 bytes: face name (UTF-8), fill color R G B
+#   glyph table   count x 22 bytes: style id, code point, advance (1/64 px),
+#                 bitmap offset x / y from the text origin, width, height,
+#                 data offset
+#   kerning table count x 14 bytes: style id, left / right code point,
+#                 adjustment (1/64 px), only non-zero pairs
+#   bitmaps       one panel code per byte, TRANSPARENT where the glyph does
+#                 not cover the artwork
+#
+# A style is one font face in one fill color: every glyph is stored as the
+# panel codes refresh.py would produce for it (antialiasing quantized to the
+# panel palette), so drawing a text is copying slices. Glyphs are stored in
+# panel orientation: the -90 degree rotation of the margin strips and the
+# +90 degree landscape -> panel rotation of getbuffer() cancel out.
+#
+# Text layout follows PIL's basic layout (anchor "la"): pen positions in
+# 1/64 px with kerning, each glyph placed at the rounded pen position.
+
+import os
+import struct
+
+ATLAS_FILE = "glyphs.e6g"
+ATLAS_MAGIC = b"E6GA"
+ATLAS_VERSION = 1
+
+ATLAS_HEADER = struct.Struct("<4sBBHII16x")  # magic, version, flags, styles, glyphs, kerning pairs
+STYLE_ENTRY = struct.Struct("<28sBBBx")      # face name, fill color
+GLYPH_ENTRY = struct.Struct("<BxIihhHHI")    # style, code point, advance, x, y, width, height, data offset
+KERN_ENTRY = struct.Struct("<BxIIi")         # style, left, right, adjustment
+
+TRANSPARENT = 0xFF
+
+
+class GlyphAtlas:
+    def __init__(self, path):
+        """
+        Reads the tables of an atlas file. Bitmaps are read on demand
+        (load()), a margin needs a few dozen of them.
+        """
+        self.path = path
+        self.bitmaps = {}
+
+        with open(path, "rb") as f:
+            fd = f.fileno()
+            magic, version, flags, nstyles, nglyphs, nkern = ATLAS_HEADER.unpack(os.pread(fd, ATLAS_HEADER.size, 0))
+            if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+                raise ValueError(f"Not a glyph atlas: {path}")
+
+            size = nstyles * STYLE_ENTRY.size + nglyphs * GLYPH_ENTRY.size + nkern * KERN_ENTRY.size
+            tables = os.pread(fd, size, ATLAS_HEADER.size)
+        if len(tables) != size:
+            raise ValueError(f"Truncated glyph atlas: {path}")
+
+        self.styles = {}
+        pos = 0
+        for style_id in range(nstyles):
+            name, r, g, b = STYLE_ENTRY.unpack_from(tables, pos)
+            self.styles[(name.rstrip(b"\0").decode("utf-8"), (r, g, b))] = style_id
+            pos += STYLE_ENTRY.size
+
+        # (style, code point) -> (advance, x, y, width, height, data offset)
+        self.glyphs = {}
+        for _ in range(nglyphs):
+            style_id, cp, *entry = GLYPH_ENTRY.unpack_from(tables, pos)
+            self.glyphs[(style_id, cp)] = tuple(entry)
+            pos += GLYPH_ENTRY.size
+
+        self.kerning = {}
+        for _ in range(nkern):
+            style_id, left, right, adjust = KERN_ENTRY.unpack_from(tables, pos)
+            self.kerning[(style_id, left, right)] = adjust
+            pos += KERN_ENTRY.size
+
+    def style(self, face, color=(0, 0, 0)):
+        """
+        Returns the style id of face in fill color, None if not in the atlas.
+        """
+        return self.styles.get((face, tuple(color)))
+
+    def covers(self, style, text):
+        return style is not None and all((style, ord(ch)) in self.glyphs for ch in text)
+
+    def load(self, style, text):
+        """
+        Reads the bitmaps of all glyphs of text not read yet (one pread each).
+        Glyphs missing from the atlas are skipped, see covers().
+        """
+        missing = {ord(ch) for ch in text if (style, ord(ch)) in self.glyphs} \
+            - {cp for s, cp in self.bitmaps if s == style}
+        if not missing:
+            return
+        with open(self.path, "rb") as f:
+            for cp in missing:
+                advance, x, y, w, h, offset = self.glyphs[(style, cp)]
+                self.bitmaps[(style, cp)] = os.pread(f.fileno(), w * h, offset)
+
+    def layout(self, style, text):
+        """
+        Returns ([(code point, x, y, width, height)], pen advance in px),
+        glyph positions relative to the text origin.
+        """
+        placed = []
+        pen = 0
+        prev = None
+        for ch in text:
+            cp = ord(ch)
+            if prev is not None:
+                pen += self.kerning.get((style, prev, cp), 0)
+            advance, x, y, w, h, offset = self.glyphs[(style, cp)]
+            placed.append((cp, ((pen + 32) >> 6) + x, y, w, h))
+            pen += advance
+            prev = cp
+        return placed, (pen + 32) >> 6
+
+    def textbbox(self, style, text, xy=(0, 0)):
+        """
+        Same box as ImageDraw.textbbox() for the font of the style.
+        """
+        placed, advance = self.layout(style, text)
+        inked = [g for g in placed if g[3] and g[4]]
+        x0 = min([0] + [x for cp, x, y, w, h in inked])
+        x1 = max([advance] + [x + w for cp, x, y, w, h in inked])
+        y0 = min([y for cp, x, y, w, h in inked] or [0])
+        y1 = max([y + h for cp, x, y, w, h in inked] or [0])
+        return xy[0] + x0, xy[1] + y0, xy[0] + x1, xy[1] + y1
+
+    def draw(self, codes, xy, style, text):
+        """
+        Copies the glyphs of text into a 2D array of panel codes (text origin
+        at xy = (column, row)), clipped to the array. Glyphs must be load()ed.
+        """
+        import numpy as np
+        rows, cols = codes.shape
+        placed, advance = self.layout(style, text)
+        for cp, x, y, w, h in placed:
+            x += xy[0]
+            y += xy[1]
+            c0, c1 = max(x, 0), min(x + w, cols)
+            r0, r1 = max(y, 0), min(y + h, rows)
+            if c0 >= c1 or r0 >= r1:
+                continue
+            glyph = np.frombuffer(self.bitmaps[(style, cp)], dtype=np.uint8).reshape(h, w)
+            glyph = glyph[r0 - y:r1 - y, c0 - x:c1 - x]
+            np.copyto(codes[r0:r1, c0:c1], glyph, where=glyph != TRANSPARENT)
+
+
+def write_atlas(path, styles, glyphs, kerning):
+    """
+    Writes an atlas file.
+
+    Args:
+        path: output file
+        styles: [(face name, (r, g, b))], position is the style id
+        glyphs: {(style id, code point): (advance, x, y, width, height, bitmap bytes)}
+        kerning: {(style id, left, right): adjustment}, zero entries are dropped
+    """
+    kerning = {k: v for k, v in kerning.items() if v}
+    table_size = len(styles) * STYLE_ENTRY.size + len(glyphs) * GLYPH_ENTRY.size + len(kerning) * KERN_ENTRY.size
+    offset = ATLAS_HEADER.size + table_size
+
+    # Bitmaps of a style are stored together, ordered by code point
+    entries = []
+    bitmaps = []
+    for key in sorted(glyphs):
+        advance, x, y, w, h, bitmap = glyphs[key]
+        if len(bitmap) != w * h:
+            raise ValueError(f"Bitmap size mismatch for glyph {key}")
+        entries.append(GLYPH_ENTRY.pack(key[0], key[1], advance, x, y, w, h, offset))
+        bitmaps.append(bytes(bitmap))
+        offset += len(bitmap)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, 0, len(styles), len(glyphs), len(kerning)))
+        for name, (r, g, b) in styles:
+            f.write(STYLE_ENTRY.pack(name.encode("utf-8"), r, g, b))
+        f.write(b"".join(entries))
+        for (style_id, left, right), adjust in sorted(kerning.items()):
+            f.write(KERN_ENTRY.pack(style_id, left, right, adjust))
+        f.write(b"".join(bitmaps))
+    os.replace(tmp_path, path)
+
+### END OF FILE ###
@@ -0,0 +1,81 @@
+# /*****************************************************************************
+# * | File        :   shuffle.py
+# * | Function    :   Stateless keyed permutation of 0..n-1 (shuffled playlist)
+# * | Info        :   Feistel network + cycle walking, O(1) time and memory
+# *----------------
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   playlist_position(): no repeat across a cycle boundary
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# ******************************************************************************/
+#
+# A balanced Feistel network is a bijection of 0..4^h-1 for any round
+# function. The smallest such domain holding n values is less than 4 n
+# large, values outside 0..n-1 are fed through the network again (cycle
+# walking) until they land inside: still a bijection, on average fewer
+# than 4 passes. Nothing has to be stored to know what position i maps to,
+# or which positions were already used.
+
+import hashlib
+
+ROUNDS = 4
+
+
+def key(seed, cycle=0):
+    """
+    Permutation key for a seed and a cycle number (a new order every cycle).
+    """
+    return hashlib.blake2b(f"{seed}:{cycle}".encode("utf-8"), digest_size=16).digest()
+
+
+def _round(value, rnd, key_bytes, mask):
+    digest = hashlib.blake2b(value.to_bytes(8, "little") + bytes([rnd]), digest_size=8, key=key_bytes).digest()
+    return int.from_bytes(digest, "little") & mask
+
+
+def _feistel(x, half_bits, key_bytes, rounds):
+    mask = (1 << half_bits) - 1
+    left, right = x >> half_bits, x & mask
+    for rnd in range(rounds):
+        left, right = right, left ^ _round(right, rnd, key_bytes, mask)
+    return (left << half_bits) | right
+
+
+def permute(i, n, key_bytes, rounds=ROUNDS):
+    """
+    Returns the position of i in a keyed permutation of 0..n-1.
+    """
+    if not 0 <= i < n:
+        raise ValueError(f"Position {i} out of range 0..{n - 1}")
+    half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+    x = _feistel(i, half_bits, key_bytes, rounds)
+    while x >= n:
+        x = _feistel(x, half_bits, key_bytes, rounds)
+    return x
+
+
+def playlist_position(days, n, seed, rounds=ROUNDS):
+    """
+    Position 0..n-1 shown `days` days after the start of a playlist which
+    shows every position once per cycle of n days, in a new order per cycle.
+    If a cycle would start with the position that ended the previous one,
+    its first two days are swapped (never a repeat on consecutive days).
+    """
+    cycle, position = divmod(days, n)
+    if n <= 2:
+        # one order avoids repeats (0, 1, 0, 1, ...)
+        return position
+
+    key_bytes = key(seed, cycle)
+    if position < 2:
+        # the swap only touches positions 0 and 1, the last one of a cycle is never swapped
+        if permute(0, n, key_bytes, rounds) == permute(n - 1, n, key(seed, cycle - 1), rounds):
+            position = 1 - position
+    return permute(position, n, key_bytes, rounds)
+
+### END OF FILE ###
@@ -0,0 +1,276 @@
+# /*****************************************************************************
+# * | File        :   wittypi.py
+# * | Function    :   Witty Pi 4 power management board (I2C)
+# * | Info        :   One bus handle per boot, block reads of the telemetry
+# * |             :   registers, burst write + read-back of the boot alarm
+# *----------------
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   rtc_time(): date and time from the RTC (system clock not set yet)
+# *----------------
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Moved from refresh.py, FakeBus register map for tests
+# ******************************************************************************/
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+I2C_BUS = 1
+I2C_MC_ADDRESS = 0x08
+I2C_VOLTAGE_IN_I = 1
+I2C_VOLTAGE_IN_D = 2
+I2C_VOLTAGE_OUT_I = 3
+I2C_VOLTAGE_OUT_D = 4
+I2C_CURRENT_OUT_I = 5
+I2C_CURRENT_OUT_D = 6
+I2C_LM75B_TEMPERATURE = 50
+I2C_START_SEC, I2C_START_MIN, I2C_START_HOUR, I2C_START_DAY = 27, 28, 29, 30
+I2C_STOP_SEC, I2C_STOP_MIN, I2C_STOP_HOUR, I2C_STOP_DAY = 32, 33, 34, 35
+
+# PCF85063 RTC of the Witty Pi 4, kept in UTC by the Witty Pi software.
+# Seconds .. years (BCD) in one read, bit 7 of seconds: oscillator stopped
+I2C_RTC_ADDRESS = 0x51
+I2C_RTC_SECONDS = 0x04
+RTC_LEN = 7
+
+# Registers 1..6 (input voltage, output voltage, output current) in one read
+TELEMETRY_LEN = I2C_CURRENT_OUT_D - I2C_VOLTAGE_IN_I + 1
+# Registers 27..35: alarm 1, weekday of alarm 1 (not written), alarm 2
+ALARM_LEN = I2C_STOP_DAY - I2C_START_SEC + 1
+
+
+# BCD Conversion Helper
+def dec_to_bcd(val):
+    return (val // 10 * 16) + (val % 10)
+
+def bcd_to_dec(val):
+    if (val >> 4) > 9 or (val & 0x0F) > 9:
+        raise ValueError(f"Invalid BCD value 0x{val:02X}")
+    return (val >> 4) * 10 + (val & 0x0F)
+
+def next_boot(time_str, now=None):
+    """
+    Returns the next occurrence of HH:MM:SS after now.
+    """
+    if now is None:
+        now = datetime.now()
+    target_time = datetime.strptime(time_str, "%H:%M:%S").time()
+    target_dt = datetime.combine(now.date(), target_time)
+
+    # If target time for today has already passed, set for tomorrow
+    if target_dt <= now:
+        target_dt += timedelta(days=1)
+    return target_dt
+
+
+class WittyPi:
+    def __init__(self, bus=None, address=I2C_MC_ADDRESS):
+        """
+        Opens the I2C bus once. A bus object (e.g. FakeBus) can be passed
+        instead. A failed open is reported, every read then returns None.
+        """
+        self.address = address
+        self.transactions = 0
+        self.lock = threading.Lock()     # sampler thread (energy.py) shares the handle
+        self.bus = bus
+        if bus is None:
+            try:
+                from smbus2 import SMBus
+                self.bus = SMBus(I2C_BUS)
+            except Exception as e:
+                print(f"I2C Hardware Error: {e}")
+
+    def close(self):
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _call(self, method, *args, address=None):
+        if self.bus is None:
+            raise OSError("I2C bus not open")
+        with self.lock:
+            self.transactions += 1
+            return getattr(self.bus, method)(self.address if address is None else address, *args)
+
+    def read_block(self, register, length):
+        return self._call("read_i2c_block_data", register, length)
+
+    def write_block(self, register, data):
+        self._call("write_i2c_block_data", register, list(data))
+
+    def telemetry(self):
+        """
+        Reads voltage (V), current (A) and temperature (C) in two transactions.
+        Returns (voltage, current, celsius), None for a failed reading.
+        """
+        voltage, voltage_out, current = self.power()
+        celsius, fahrenheit = self.temperature()
+        return voltage, current, celsius
+
+    def power(self, report=True):
+        """
+        Reads input voltage (V), output voltage (V) and output current (A)
+        in one transaction. Returns (v_in, v_out, i_out), None on failure
+        (printed unless report is False).
+        """
+        try:
+            regs = self.read_block(I2C_VOLTAGE_IN_I, TELEMETRY_LEN)
+            # Integer part + (Decimal / 100)
+            return tuple(round(regs[i] + regs[i + 1] / 100.0, 2) for i in (0, 2, 4))
+        except Exception as e:
+            if report:
+                print(f"Error reading from I2C bus: {e}")
+            return None, None, None
+
+    def temperature(self):
+        """
+        Reads the LM75B temperature sensor on the Witty Pi 4.
+        Returns a tuple of (Celsius, Fahrenheit).
+        """
+        try:
+            # Read a 16-bit word from register 50
+            # smbus2 read_word_data returns little-endian (LSB, MSB)
+            raw_data = self._call("read_word_data", I2C_LM75B_TEMPERATURE)
+
+            # 1. Byte Swap: The LM75B provides MSB first.
+            swapped = ((raw_data & 0xFF) << 8) | (raw_data >> 8)
+
+            # 2. Shift: The 11-bit temperature value is left-justified.
+            temp_raw = swapped >> 5
+
+            # 3. Handle Negative Values (Two's Complement)
+            if temp_raw & 0x400:
+                temp_raw -= 2048
+
+            # 4. Scale: Each LSB represents 0.125 degrees Celsius.
+            celsius = temp_raw * 0.125
+            fahrenheit = (celsius * 1.8) + 32
+
+            return round(celsius, 2), round(fahrenheit, 2)
+
+        except Exception as e:
+            print(f"Error reading temperature: {e}")
+            return None, None
+
+    def rtc_time(self):
+        """
+        Reads the RTC in one transaction. Returns an aware UTC datetime,
+        None if the read failed or the RTC has lost its time.
+        """
+        try:
+            regs = self._call("read_i2c_block_data", I2C_RTC_SECONDS, RTC_LEN, address=I2C_RTC_ADDRESS)
+            if regs[0] & 0x80:
+                print("RTC oscillator stopped, time not valid")
+                return None
+            second = bcd_to_dec(regs[0] & 0x7F)
+            minute = bcd_to_dec(regs[1] & 0x7F)
+            hour = bcd_to_dec(regs[2] & 0x3F)
+            day = bcd_to_dec(regs[3] & 0x3F)      # regs[4]: weekday
+            month = bcd_to_dec(regs[5] & 0x1F)
+            year = 2000 + bcd_to_dec(regs[6])
+            return datetime(year, month, day, hour, minute, second, tzinfo=timezone.utc)
+        except Exception as e:
+            print(f"Error reading RTC: {e}")
+            return None
+
+    def set_daily_boot(self, time_str="02:00:00", now=None):
+        """
+        Sets Witty Pi 4 to boot daily at HH:MM:SS and clears any auto-shutdowns.
+        Alarm 1 and alarm 2 are written as one block each and read back;
+        on a mismatch they are written byte by byte and verified again.
+        """
+        try:
+            target_dt = next_boot(time_str, now)
+        except Exception as e:
+            print(f"Error parsing time: {e}")
+            return False
+
+        start = [dec_to_bcd(v) for v in (target_dt.second, target_dt.minute, target_dt.hour, target_dt.day)]
+        stop = [0, 0, 0, 0]
+
+        try:
+            for bytewise in (False, True):
+                self._write_alarms(start, stop, bytewise)
+                regs = self.read_block(I2C_START_SEC, ALARM_LEN)
+                if list(regs[:4]) == start and list(regs[5:]) == stop:
+                    print(f"Success: Boot set for {time_str} daily. All shutdown alarms cleared.")
+                    return True
+                print(f"Alarm read-back mismatch ({'byte' if bytewise else 'block'} write): {list(regs)}")
+            return False
+        except Exception as e:
+            print(f"I2C Hardware Error: {e}")
+            return False
+
+    def _write_alarms(self, start, stop, bytewise):
+        if not bytewise:
+            self.write_block(I2C_START_SEC, start)
+            self.write_block(I2C_STOP_SEC, stop)
+            return
+        for register, value in zip(range(I2C_START_SEC, I2C_START_DAY + 1), start):
+            self._call("write_byte_data", register, value)
+        for register, value in zip(range(I2C_STOP_SEC, I2C_STOP_DAY + 1), stop):
+            self._call("write_byte_data", register, value)
+
+
+class FakeBus:
+    """
+    In-memory Witty Pi 4 register map with the smbus2.SMBus calls used above,
+    for testing and benchmarking scheduling and battery logic without hardware.
+    The RTC (I2C_RTC_ADDRESS) has its own map, set to the system time.
+    """
+    def __init__(self, voltage=15.60, current=0.05, celsius=25.0, voltage_out=5.10):
+        self.registers = bytearray(256)
+        self.rtc = bytearray(16)
+        self.calls = 0
+        self.set_telemetry(voltage, current, celsius, voltage_out)
+        self.set_rtc(datetime.now(timezone.utc))
+
+    def _map(self, address):
+        return self.rtc if address == I2C_RTC_ADDRESS else self.registers
+
+    def set_rtc(self, utc):
+        self.rtc[I2C_RTC_SECONDS:I2C_RTC_SECONDS + RTC_LEN] = bytes(dec_to_bcd(v) for v in (
+            utc.second, utc.minute, utc.hour, utc.day, utc.isoweekday() % 7, utc.month, utc.year % 100))
+
+    def set_telemetry(self, voltage, current, celsius, voltage_out=5.10):
+        r = self.registers
+        r[I2C_VOLTAGE_IN_I], r[I2C_VOLTAGE_IN_D] = int(voltage), round(voltage * 100) % 100
+        r[I2C_VOLTAGE_OUT_I], r[I2C_VOLTAGE_OUT_D] = int(voltage_out), round(voltage_out * 100) % 100
+        r[I2C_CURRENT_OUT_I], r[I2C_CURRENT_OUT_D] = int(current), round(current * 100) % 100
+        raw = (round(celsius / 0.125) & 0x7FF) << 5
+        r[I2C_LM75B_TEMPERATURE], r[I2C_LM75B_TEMPERATURE + 1] = raw >> 8, raw & 0xFF
+
+    def read_byte_data(self, address, register):
+        self.calls += 1
+        return self._map(address)[register]
+
+    def write_byte_data(self, address, register, value):
+        self.calls += 1
+        self._map(address)[register] = value
+
+    def read_word_data(self, address, register):
+        self.calls += 1
+        regs = self._map(address)
+        return regs[register] | (regs[register + 1] << 8)
+
+    def read_i2c_block_data(self, address, register, length):
+        self.calls += 1
+        return list(self._map(address)[register:register + length])
+
+    def write_i2c_block_data(self, address, register, data):
+        self.calls += 1
+        self._map(address)[register:register + len(data)] = bytes(data)
+
+    def close(self):
+        pass
+
+### END OF FILE ###
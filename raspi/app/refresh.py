@@ -6,6 +6,21 @@
 # * | Info        :
 # * | This version:   V1.0
 # * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Pre-packed frames (.e6) read with mmap, single-file artwork bundle,
+# * |             :   clear refresh policy, skip of an already displayed frame,
+# * |             :   EPD opened in main only (headless rendering, see render.py),
+# * |             :   Witty Pi access through lib/wittypi.py (one I2C bus handle),
+# * |             :   per-boot energy accounting (lib/energy.py),
+# * |             :   per-boot record in a preallocated ring file (lib/bootlog.py),
+# * |             :   BUSY deadlines + refresh watchdog,
+# * |             :   PIL / NumPy / fonts loaded on demand, precomposed daily frame fast path,
+# * |             :   margins composed from a pre-rendered glyph atlas (lib/glyphatlas.py),
+# * |             :   margins merged into pre-packed frames without unpacking them,
+# * |             :   binary catalog index (lib/artindex.py), NBR_IMAGES from the catalog,
+# * |             :   stateless shuffled playlist (lib/shuffle.py),
+# * |             :   look-ahead: tomorrow's frame composed during the refresh, battery patched in
+# *----------------
 # * | Date        :   2026-02-08
 # * | Info        :   Added boot time schedule
 # *----------------
@@ -14,6 +29,9 @@
 # *----------------
 # ******************************************************************************/
 
+import time
+IMPORT_START = time.perf_counter()
+
 import sys
 import os
 import io
@@ -26,19 +44,89 @@ fontdir = os.path.join(current_dir, 'font')
 sys.path.append(libdir)
 
 import epd13in3E
-import time
-from datetime import datetime, timedelta
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
+import epdframe
+import artbundle
+import artindex
+import wittypi
+import energy
+import bootlog
+import glyphatlas
+import shuffle
+from datetime import datetime, timedelta, timezone
 import json
+import hashlib
+import threading
 from typing import Tuple
-from smbus2 import SMBus
 
-epd = epd13in3E.EPD()
-json_cache = []
+epd = None          # EPD, opened in main (render.py composes frames without it)
+witty = None        # WittyPi, opened in main
+sampler = None      # EnergySampler of this boot, started in main
+json_cache = {}     # 1-based index -> metadata record
 image_cache = None
-
-NBR_IMAGES = 600
+frame_cache = None
+precomposed = False # frame_cache is today's complete frame (DAILY_DIR)
+
+# PIL, NumPy and the fonts are loaded by load_imaging(), only on the paths
+# which compose a frame. Measured with bench-import.py against this budget
+# (import of refresh.py up to main, Pi Zero 2 W).
+Image = ImageDraw = ImageFont = np = None
+IMPORT_BUDGET_MS = 300
+
+# Margin texts are copied from the glyph atlas (tools/build-atlas.py) when it
+# covers them, the fonts are loaded only as a fallback
+ATLAS_PATH = os.path.join(fontdir, glyphatlas.ATLAS_FILE)
+atlas = None        # GlyphAtlas, opened on first use
+
+NBR_IMAGES = None   # catalog size, read once by catalog_size()
+
+REFERENCE_DATE = datetime(2026, 1, 24).date()   # day of index 1 ("sequential")
+
+# The service can start before the Witty Pi daemon has set the system clock
+# from its RTC (eink-update.service). check_clock() reads the RTC once; if the
+# system clock is further off than CLOCK_TOLERANCE_S, now() follows the RTC.
+CLOCK_TOLERANCE_S = 120
+clock_offset = timedelta(0)     # RTC - system clock, 0 when the clock is set
+
+# Order of the artworks: "sequential" (catalog order) or "shuffle" (opt-in):
+# every NBR_IMAGES days show each artwork once, in a new order per cycle,
+# derived from PLAYLIST_SEED alone (keyed permutation, no state file)
+PLAYLIST_ORDER = "sequential"
+PLAYLIST_SEED = 20260124
+
+# Full white refresh before the artwork (limits ghosting, costs a second
+# refresh cycle): "always", "never" or "every" CLEAR_EVERY_DAYS days
+CLEAR_POLICY = "always"
+CLEAR_EVERY_DAYS = 7
+
+# Per boot record (printed to the journal at the end of display())
+boot_stats = {}
+
+# Fingerprint of the frame on the panel (day index, content hash, texts),
+# a second wake-up on the same day with the same frame skips the refresh
+FINGERPRINT_FILE = os.path.join(current_dir, "last_frame.json")
+
+# One binary record per boot: timings, mAh per phase, BUSY durations, telemetry
+# (lib/bootlog.py, tools/bootlog-csv.py)
+RING_FILE = os.path.join(current_dir, bootlog.RING_FILE)
+
+# Last resort if the refresh is stuck outside the BUSY deadlines of the driver
+# (epd13in3E.BUSY_DEADLINES): after this many seconds of cache + refresh the
+# panel is powered off (POF, deep sleep), the boot record is written with
+# bootlog.FLAG_WATCHDOG and the Pi is powered off
+REFRESH_WATCHDOG = 300
+
+record_lock = threading.Lock()
+record_saved = False    # boot record written (main thread or watchdog)
+
+# Fast path: frames composed for a given day without the battery text, named
+# <YYYY-MM-DD>_<index>.e6. Only the battery text is merged in (glyph atlas),
+# no image processing. Ignored if older than the artwork, catalog or atlas.
+DAILY_DIR = os.path.join(picdir, "daily")
+
+# Look-ahead: tomorrow's frame is composed while the panel runs its refresh
+# waveform and written to DAILY_DIR after power-off. Frames rendered offline
+# (render.py --format e6 --no-battery) are kept.
+LOOKAHEAD = True
 
 DISPLAY_W = 1600
 DISPLAY_H = 1200
@@ -53,115 +141,52 @@ DATE_FONT_SIZE = 60
 FOOTER_FONT_SIZE = 30
 FOOTER_FONT_SIZE_SMALL = 18
 
-I2C_BUS = 1
-I2C_MC_ADDRESS = 0x08
-I2C_VOLTAGE_IN_I = 1
-I2C_VOLTAGE_IN_D = 2
-I2C_CURRENT_OUT_I = 5
-I2C_CURRENT_OUT_D = 6
-I2C_LM75B_TEMPERATURE = 50
-I2C_START_SEC, I2C_START_MIN, I2C_START_HOUR, I2C_START_DAY = 27, 28, 29, 30
-I2C_STOP_SEC, I2C_STOP_MIN, I2C_STOP_HOUR, I2C_STOP_DAY = 32, 33, 34, 35
-
-try:
-    font_regular = ImageFont.truetype(os.path.join(fontdir, "arial.ttf"), FOOTER_FONT_SIZE)
-    font_regular_small = ImageFont.truetype(os.path.join(fontdir, "arial.ttf"), FOOTER_FONT_SIZE_SMALL)
-    font_bold = ImageFont.truetype(os.path.join(fontdir, "arialbd.ttf"), DATE_FONT_SIZE)
-    font_italic = ImageFont.truetype(os.path.join(fontdir, "ariali.ttf"), FOOTER_FONT_SIZE)
-except Exception:
-    font_regular = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), FOOTER_FONT_SIZE)
-    font_regular_small = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), FOOTER_FONT_SIZE_SMALL)
-    font_bold = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), DATE_FONT_SIZE)
-    font_italic = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), FOOTER_FONT_SIZE)
-
-# BCD Conversion Helper
-def dec_to_bcd(val):
-    return (val // 10 * 16) + (val % 10)
-
-def set_wittypi_daily_boot(time_str="02:00:00"):
-    """
-    Sets Witty Pi 4 to boot daily at HH:MM:SS and clears any auto-shutdowns.
-    """
-
-    # Calculate the 'Next' occurrence date
-    try:
-        now = datetime.now()
-        target_time = datetime.strptime(time_str, "%H:%M:%S").time()
-        target_dt = datetime.combine(now.date(), target_time)
+font_regular = font_regular_small = font_bold = font_italic = None
 
-        # If target time for today has already passed, set for tomorrow
-        if target_dt <= now:
-            target_dt += timedelta(days=1)
+def load_imaging():
+    """
+    Imports PIL and NumPy, once.
+    """
+    global Image, ImageDraw, ImageFont, np, PALETTE_IMG
+    if Image is not None:
+        return
 
-        # Extract components for the hardware
-        h, m, s, day = target_dt.hour, target_dt.minute, target_dt.second, target_dt.day
-    except Exception as e:
-        print(f"Error parsing time: {e}")
-        return False
+    from PIL import Image, ImageDraw, ImageFont
+    import numpy as np
 
-    # Hardware Write
-    try:
-        with SMBus(I2C_BUS) as bus:
-            # --- Set Startup Alarm (Alarm 1) ---
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_START_DAY,  dec_to_bcd(day))
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_START_HOUR, dec_to_bcd(h))
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_START_MIN,  dec_to_bcd(m))
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_START_SEC,  dec_to_bcd(s))
-
-            # --- Clear Shutdown Alarm (Alarm 2) ---
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_STOP_DAY,  0)
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_STOP_HOUR, 0)
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_STOP_MIN,  0)
-            bus.write_byte_data(I2C_MC_ADDRESS, I2C_STOP_SEC,  0)
-
-        print(f"Success: Boot set for {time_str} daily. All shutdown alarms cleared.")
-        return True
-    except Exception as e:
-        print(f"I2C Hardware Error: {e}")
-        return False
+    PALETTE_IMG = waveshare_palette()
 
-def get_input_voltage():
+def load_fonts():
     """
-    Reads the integer and decimal parts of the input voltage 
-    from the Witty Pi 4 micro-controller.
+    Loads the fonts, once.
     """
+    global font_regular, font_regular_small, font_bold, font_italic
+    load_imaging()
+    if font_bold is not None:
+        return
+
     try:
-        # We use a context manager to ensure the bus is closed properly
-        with SMBus(I2C_BUS) as bus:
-            # Read the integer part (Index 1)
-            volt_i = bus.read_byte_data(I2C_MC_ADDRESS, I2C_VOLTAGE_IN_I)
-            
-            # Read the decimal part (Index 2)
-            volt_d = bus.read_byte_data(I2C_MC_ADDRESS, I2C_VOLTAGE_IN_D)
-            
-            # Calculate the total voltage: Integer + (Decimal / 100)
-            voltage = volt_i + (volt_d / 100.0)
-            return round(voltage, 2)
-            
-    except Exception as e:
-        print(f"Error reading from I2C bus: {e}")
-        return None
+        font_regular = ImageFont.truetype(os.path.join(fontdir, "arial.ttf"), FOOTER_FONT_SIZE)
+        font_regular_small = ImageFont.truetype(os.path.join(fontdir, "arial.ttf"), FOOTER_FONT_SIZE_SMALL)
+        font_bold = ImageFont.truetype(os.path.join(fontdir, "arialbd.ttf"), DATE_FONT_SIZE)
+        font_italic = ImageFont.truetype(os.path.join(fontdir, "ariali.ttf"), FOOTER_FONT_SIZE)
+    except Exception:
+        font_regular = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), FOOTER_FONT_SIZE)
+        font_regular_small = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), FOOTER_FONT_SIZE_SMALL)
+        font_bold = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), DATE_FONT_SIZE)
+        font_italic = ImageFont.truetype(os.path.join(fontdir, "Font.ttc"), FOOTER_FONT_SIZE)
 
-def get_output_current():
+def load_atlas():
     """
-    Reads the output (discharged) current from the Witty Pi 4.
-    Returns the current in Amperes (A).
+    Opens the glyph atlas once. Returns None without an atlas file.
     """
-    try:
-        with SMBus(I2C_BUS) as bus:
-            # Read integer part (Index 5)
-            curr_i = bus.read_byte_data(I2C_MC_ADDRESS, I2C_CURRENT_OUT_I)
-            
-            # Read decimal part (Index 6)
-            curr_d = bus.read_byte_data(I2C_MC_ADDRESS, I2C_CURRENT_OUT_D)
-            
-            # Combine components: Amps = Integer + (Decimal / 100.0)
-            current = curr_i + (curr_d / 100.0)
-            return round(current, 2)
-            
-    except Exception as e:
-        print(f"Error reading current: {e}")
-        return None
+    global atlas
+    if atlas is None and os.path.exists(ATLAS_PATH):
+        try:
+            atlas = glyphatlas.GlyphAtlas(ATLAS_PATH)
+        except Exception as e:
+            print(f"Error reading glyph atlas: {e}")
+    return atlas
 
 def soc_from_voltage(v_pack):
     """
@@ -273,40 +298,6 @@ def soc_with_compensation(v_pack, load_current_a=0.0, temp_c=25.0):
     return round(soc)
 
 
-def get_temperature():
-    """
-    Reads the LM75B temperature sensor on the Witty Pi 4.
-    Returns a tuple of (Celsius, Fahrenheit).
-    """
-    try:
-        with SMBus(I2C_BUS) as bus:
-            # Read a 16-bit word from register 50
-            # smbus2 read_word_data returns little-endian (LSB, MSB)
-            raw_data = bus.read_word_data(I2C_MC_ADDRESS, I2C_LM75B_TEMPERATURE)
-
-            # 1. Byte Swap: The LM75B provides MSB first.
-            # We need to swap the bytes to match the sensor's internal alignment.
-            swapped = ((raw_data & 0xFF) << 8) | (raw_data >> 8)
-
-            # 2. Shift: The 11-bit temperature value is left-justified.
-            # We shift right by 5 bits to get the actual 11-bit integer.
-            temp_raw = swapped >> 5
-
-            # 3. Handle Negative Values (Two's Complement):
-            # If the 11th bit (0x400) is set, the temperature is negative.
-            if temp_raw & 0x400:
-                temp_raw -= 2048
-
-            # 4. Scale: Each LSB represents 0.125 degrees Celsius.
-            celsius = temp_raw * 0.125
-            fahrenheit = (celsius * 1.8) + 32
-
-            return round(celsius, 2), round(fahrenheit, 2)
-
-    except Exception as e:
-        print(f"Error reading temperature: {e}")
-        return None, None
-
 # the same which is used by original Waveshare library
 ACTUAL_PALETTE = [
     0, 0, 0,        # Black
@@ -334,7 +325,7 @@ def waveshare_palette():
     pal.putpalette(ACTUAL_PALETTE)
     return pal
 
-PALETTE_IMG = waveshare_palette()
+PALETTE_IMG = None  # built by load_imaging()
 
 def color_for_index(i: int) -> tuple[int, int, int]:
     """
@@ -346,23 +337,92 @@ def color_for_index(i: int) -> tuple[int, int, int]:
     print("Color = ", permuted)
     return FONT_COLORS[permuted]
 
-def get_day_index() -> int:
-    # Reference date: January 24, 2026 (index 1)
-    reference_date = datetime(2026, 1, 24).date()
+def now() -> datetime:
+    """
+    Local date and time, corrected by check_clock().
+    """
+    return datetime.now() + clock_offset
 
-    current_date = datetime.now().date()
-    days_elapsed = (current_date - reference_date).days
-    index = (days_elapsed % NBR_IMAGES) + 1
+def check_clock():
+    """
+    Compares the system clock with the Witty Pi RTC and sets clock_offset
+    if it is not set yet (e.g. 1970 or the last fake-hwclock time).
+    """
+    global clock_offset
+    rtc = witty.rtc_time() if witty is not None else None
+    if rtc is None:
+        print("RTC not available, using the system clock")
+        return
+    offset = rtc - datetime.now(timezone.utc)
+    if abs(offset.total_seconds()) > CLOCK_TOLERANCE_S:
+        print(f"System clock off by {offset.total_seconds():.0f} s, using the RTC ({rtc.isoformat()})")
+        clock_offset = offset
+        boot_stats["clock_offset_s"] = round(offset.total_seconds())
+
+def get_days_elapsed(day=None) -> int:
+    if day is None:
+        day = now().date()
+    return (day - REFERENCE_DATE).days
+
+def catalog_size() -> int:
+    """
+    Number of artworks: from the bundle or binary index header,
+    counted in index.json only without either.
+    """
+    global NBR_IMAGES
+    if NBR_IMAGES is None:
+        bundle_path = os.path.join(picdir, artbundle.BUNDLE_FILE)
+        index_path = os.path.join(picdir, artindex.INDEX_FILE)
+        if os.path.exists(bundle_path):
+            NBR_IMAGES = artbundle.read_count(bundle_path)
+        elif os.path.exists(index_path):
+            NBR_IMAGES = artindex.read_count(index_path)
+        else:
+            with open(os.path.join(picdir, "index.json"), "r", encoding="utf-8") as f:
+                NBR_IMAGES = len(json.load(f))
+    return NBR_IMAGES
+
+def get_day_index(day=None) -> int:
+    """
+    Artwork of the day, 1..NBR_IMAGES. "shuffle" permutes the position in
+    the current cycle (lib/shuffle.py), O(1) for any catalog size.
+    """
+    days = get_days_elapsed(day)
+    if PLAYLIST_ORDER == "shuffle":
+        position = shuffle.playlist_position(days, catalog_size(), PLAYLIST_SEED)
+    else:
+        position = days % catalog_size()
+    index = position + 1
 
     return index
 
+def clear_required(days_elapsed) -> bool:
+    """
+    Applies CLEAR_POLICY. Stateless: "every" uses the day number,
+    so no file has to be written to remember the last clear.
+    """
+    if CLEAR_POLICY == "never":
+        return False
+    if CLEAR_POLICY == "every":
+        return days_elapsed % max(1, CLEAR_EVERY_DAYS) == 0
+    return True
+
 MASK_COLOR = (255, 0, 255)  # Magenta — NOT in Spectra 6
 
-def draw_date(canvas, number):
+BATTERY_CHARS = "Battery: 0123456789?%"     # every battery_label() text
+
+def date_text(day=None) -> str:
+    if day is None:
+        day = now()
+    return day.strftime("%d %B %Y")
+
+def draw_date(canvas, number, date_str=None):
 # =====================================================
 # DATE — draw vertical text on RIGHT edge
 # =====================================================
-    date_str = datetime.now().strftime("%d %B %Y")
+    load_fonts()
+    if date_str is None:
+        date_str = date_text()
     date_text_img = Image.new("RGB", (DISPLAY_H, RIGHT_MARGIN), color=(255, 255, 255))   # exact palette white
     td = ImageDraw.Draw(date_text_img)
 
@@ -383,14 +443,11 @@ def draw_date(canvas, number):
 
 def read_artwork_by_index(index) -> Tuple[str, str, int]:
     """
-    Read a record by 1-based index from a JSON array file
+    Read a cached record by 1-based index (index.e6i, index.json or bundle)
     and return (title, artistName, completitionYear).
     """
-    records = json_cache
-
-    try:
-        record = records[index - 1]
-    except IndexError:
+    record = json_cache.get(index)
+    if record is None:
         raise ValueError(f"No record at position {index}")
 
     return (
@@ -399,28 +456,58 @@ def read_artwork_by_index(index) -> Tuple[str, str, int]:
         record["completitionYear"],
     )
 
-def draw_footer(canvas, number):
-# =====================================================
-# FOOTER — draw vertical text on LEFT edge
-# =====================================================
-    c, f = get_temperature()
+def read_telemetry():
+    """
+    Reads battery telemetry from the Witty Pi 4 (I2C).
+    Returns (voltage, current, celsius), None for a failed reading.
+    """
+    if witty is None:
+        return None, None, None
+    return witty.telemetry()
+
+def battery_soc(telemetry):
+    """
+    Returns the SOC (%) for telemetry (voltage, current, celsius), None without voltage.
+    """
+    v, a, c = telemetry
+    if v is None:
+        return None
     if c is None:
         c = 25.0 # no compensation
-    a = get_output_current()
     if a is None:
         a = 0.0  # no compensation
-    v = get_input_voltage()
-    if v is None:
-        battery_pct = "??%"
-    else:
-        soc = soc_with_compensation(v, a, c)
-        battery_pct = f"{soc}%"
+    return soc_with_compensation(v, a, c)
+
+def battery_label(telemetry):
+    soc = battery_soc(telemetry)
+    battery_pct = "??%" if soc is None else f"{soc}%"
+    return "Battery: " + battery_pct
+
+def footer_texts(number, telemetry=None):
+    """
+    Returns the footer texts (artist_text, title_text, year_text, battery_text)
+    from artwork metadata and battery telemetry (voltage, current, celsius),
+    read over I2C unless given.
+    """
+    if telemetry is None:
+        telemetry = read_telemetry()
 
     title, artist, year = read_artwork_by_index(number)
     artist_text = f"{number}. {artist}: "
     title_text = title
-    year_text = f" ({year:04d})"
-    battery_text =  "Battery: " + battery_pct
+    year_text = "" if year is None else f" ({year:04d})"     # unknown year: left out
+    battery_text = battery_label(telemetry)
+
+    return artist_text, title_text, year_text, battery_text
+
+def draw_footer(canvas, number, texts=None):
+# =====================================================
+# FOOTER — draw vertical text on LEFT edge
+# =====================================================
+    load_fonts()
+    if texts is None:
+        texts = footer_texts(number)
+    artist_text, title_text, year_text, battery_text = texts
 
     footer_img = Image.new("RGB", (DISPLAY_H, LEFT_MARGIN), MASK_COLOR)
     fd = ImageDraw.Draw(footer_img)
@@ -453,39 +540,494 @@ def draw_footer(canvas, number):
     mask = Image.fromarray(mask, mode="L")
     canvas.paste(footer_img, (0, 0), mask)
 
-def cache_data(number):
+def margin_strips(number, date_str, texts):
+    """
+    Lays out the date and the footer from the glyph atlas, at the positions
+    of draw_date / draw_footer. Returns (date strip, footer strip): panel
+    codes in panel orientation, RIGHT_MARGIN resp. LEFT_MARGIN rows of
+    DISPLAY_H pixels, glyphatlas.TRANSPARENT where the artwork shows.
+    Returns None without an atlas or if a glyph is missing.
+    """
+    import numpy as np      # packed frames are overlaid without PIL
+    a = load_atlas()
+    if a is None:
+        return None
+
+    artist_text, title_text, year_text, battery_text = texts
+    date_style = a.style("bold", color_for_index(number))
+    regular, italic, small = a.style("regular"), a.style("italic"), a.style("regular_small")
+
+    runs = ((date_style, date_str), (regular, "Ag" + artist_text + year_text),
+            (italic, title_text), (small, "Ag" + battery_text))
+    if not all(a.covers(style, text) for style, text in runs):
+        print("Glyph atlas does not cover the margin texts, drawing with fonts")
+        return None
+    for style, text in runs:
+        a.load(style, text)
+
+    date = np.full((RIGHT_MARGIN, DISPLAY_H), glyphatlas.TRANSPARENT, dtype=np.uint8)
+    bbox = a.textbbox(date_style, date_str)
+    tw = bbox[2] - bbox[0]
+    th = bbox[3] - bbox[1]
+    a.draw(date, (((DISPLAY_H - tw) // 2), ((RIGHT_MARGIN - th) // 2) - 10), date_style, date_str)
+
+    footer = np.full((LEFT_MARGIN, DISPLAY_H), glyphatlas.TRANSPARENT, dtype=np.uint8)
+    bbox = a.textbbox(regular, "Ag")
+    baseline = LEFT_MARGIN - (bbox[3] - bbox[1]) - 10
+
+    x = 10
+    a.draw(footer, (x, baseline), regular, artist_text)
+    x += a.textbbox(regular, artist_text)[2]
+    a.draw(footer, (x, baseline), italic, title_text)
+    x += a.textbbox(italic, title_text)[2]
+    a.draw(footer, (x, baseline), regular, year_text)
+
+    draw_battery(a, footer, battery_text)
+
+    return date, footer
+
+def draw_battery(a, footer, battery_text):
+    # battery right-aligned, drawn last (may be merged later, see battery_strip)
+    small = a.style("regular_small")
+    bboxs = a.textbbox(small, "Ag")
+    bs = LEFT_MARGIN - (bboxs[3] - bboxs[1]) - 10
+    bw = a.textbbox(small, battery_text)[2]
+    a.draw(footer, (DISPLAY_H - bw - 10, bs), small, battery_text)
+
+def battery_strip(battery_text):
+    """
+    Footer strip (as margin_strips) holding the battery text only, merged into
+    frames composed without it. None without an atlas covering the text.
+    """
+    import numpy as np
+    a = load_atlas()
+    if a is None:
+        return None
+    small = a.style("regular_small")
+    if not a.covers(small, "Ag" + battery_text):
+        return None
+    a.load(small, "Ag" + battery_text)
+
+    footer = np.full((LEFT_MARGIN, DISPLAY_H), glyphatlas.TRANSPARENT, dtype=np.uint8)
+    draw_battery(a, footer, battery_text)
+    return footer
+
+def draw_margins(canvas, number, date_str, texts):
+    """
+    Copies the atlas margins into a landscape "P" canvas in the panel palette.
+    Returns the new image, None if the margins must be drawn with the fonts.
+    """
+    if canvas.mode != "P" or tuple(canvas.getpalette()[:len(epdframe.PANEL_PALETTE)]) != epdframe.PANEL_PALETTE:
+        return None
+    strips = margin_strips(number, date_str, texts)
+    if strips is None:
+        return None
+
+    arr = np.array(canvas)
+    for strip, x0 in zip(strips, (DISPLAY_W - RIGHT_MARGIN, 0)):
+        # strip row r is landscape column x0 + height - 1 - r, strip column c is row c
+        view = arr[:, x0:x0 + strip.shape[0]][:, ::-1]
+        np.copyto(view, strip.T, where=strip.T != glyphatlas.TRANSPARENT)
+
+    img = Image.frombytes("P", canvas.size, arr.tobytes())
+    img.putpalette(canvas.getpalette())
+    return img
+
+def cache_bundle(number, path):
     global json_cache
     global image_cache
+    global frame_cache
 
-    with open(os.path.join(picdir, "index.json"), "r", encoding="utf-8") as f:
-        json_cache = json.load(f)
+    # One open, one read of today's record (metadata + frame)
+    meta, kind, frame = artbundle.read_record(path, number)
+    json_cache = {number: meta}
+
+    if kind == artbundle.KIND_E6:
+        frame_cache = epdframe.parse_frame(frame, path)
+    else:
+        load_imaging()
+        image_cache = Image.open(io.BytesIO(frame))
+        image_cache.load()
+
+def cache_files(number):
+    global json_cache
+    global image_cache
+    global frame_cache
+
+    index_path = os.path.join(picdir, artindex.INDEX_FILE)
+    if os.path.exists(index_path):
+        # One record of the binary index instead of parsing the whole catalog
+        json_cache = {number: artindex.read_record(index_path, number)}
+    else:
+        with open(os.path.join(picdir, "index.json"), "r", encoding="utf-8") as f:
+            json_cache = dict(enumerate(json.load(f), start=1))
 
     formatted_number = f"{number:04d}"
-    filename = f"{formatted_number}_1600x1200.bmp"
-    image_cache = Image.open(os.path.join(picdir, filename))
-    image_cache.load()
+    frame_path = os.path.join(picdir, f"{formatted_number}_1600x1200{epdframe.FRAME_EXT}")
+    if os.path.exists(frame_path):
+        # Pre-packed panel frame: half the SD reads, no decode/rotate/quantize.
+        # Mapped pages are locked in RAM by lockit() below.
+        frame_cache = epdframe.load_frame(frame_path)
+    else:
+        filename = f"{formatted_number}_1600x1200.bmp"
+        load_imaging()
+        image_cache = Image.open(os.path.join(picdir, filename))
+        image_cache.load()
+
+def load_artwork(number):
+    bundle_path = os.path.join(picdir, artbundle.BUNDLE_FILE)
+    if os.path.exists(bundle_path):
+        cache_bundle(number, bundle_path)
+    else:
+        cache_files(number)
+
+def daily_frame_path(number, day=None):
+    if day is None:
+        day = now().date()
+    return os.path.join(DAILY_DIR, f"{day.isoformat()}_{number:04d}{epdframe.FRAME_EXT}")
+
+def daily_frame_stale(path, number):
+    """
+    True if the artwork, the catalog or the glyph atlas changed after the
+    daily frame was written.
+    """
+    bundle_path = os.path.join(picdir, artbundle.BUNDLE_FILE)
+    if os.path.exists(bundle_path):
+        sources = [bundle_path]
+    else:
+        name = f"{number:04d}_1600x1200"
+        sources = [os.path.join(picdir, artindex.INDEX_FILE), os.path.join(picdir, "index.json"),
+                   os.path.join(picdir, name + epdframe.FRAME_EXT), os.path.join(picdir, name + ".bmp")]
+    sources.append(ATLAS_PATH)
+
+    mtime = os.stat(path).st_mtime
+    for source in sources:
+        try:
+            if os.stat(source).st_mtime > mtime:
+                return True
+        except FileNotFoundError:
+            pass
+    return False
+
+def cache_data(number):
+    global frame_cache
+    global precomposed
+
+    daily_path = daily_frame_path(number)
+    if os.path.exists(daily_path):
+        if daily_frame_stale(daily_path, number):
+            print(f"Daily frame {daily_path} is stale, composing")
+        else:
+            try:
+                # Today's frame without the battery text: no metadata, fonts or PIL needed
+                frame_cache = epdframe.load_frame(daily_path)
+                precomposed = True
+            except Exception as e:
+                print(f"Error reading daily frame {daily_path}: {e}")
+    if not precomposed:
+        load_artwork(number)
 
     epd.lockit()
 
+def compose(number, date_str, texts):
+    """
+    Returns the final landscape frame: cached artwork with date and footer.
+    """
+    if frame_cache is not None:
+        # margins change daily, composite them on the decoded frame
+        img = epdframe.frame_to_image(*frame_cache)
+    else:
+        img = image_cache
+    load_imaging()
+    composed = draw_margins(img, number, date_str, texts)
+    if composed is not None:
+        return composed
+    draw_date(img, number, date_str)
+    draw_footer(img, number, texts)
+    return img
+
+def prepare_frame(number, date_str, texts):
+    """
+    Returns today's frame as (master, slave) chunks for display_stream.
+    The margins of a pre-packed frame are merged into its packed rows,
+    the artwork is passed through untouched. Anything else is composed
+    as an image and packed by the driver.
+    """
+    if frame_cache is not None:
+        strips = margin_strips(number, date_str, texts)
+        if strips is not None:
+            date, footer = (epdframe.pack_overlay(strip, glyphatlas.TRANSPARENT) for strip in strips)
+            return epdframe.overlay_frame(*frame_cache, [(0, date), (epdframe.PANEL_H - LEFT_MARGIN, footer)])
+
+    return epd.prepare_image(compose(number, date_str, texts))
+
+def patch_battery(battery_text):
+    """
+    Returns the precomposed frame (frame_cache) as (master, slave) chunks
+    with the battery text merged into the packed footer rows. Sent as
+    stored if the atlas does not cover the text.
+    """
+    strip = battery_strip(battery_text)
+    if strip is None:
+        print("Battery text not in the glyph atlas, daily frame sent as stored")
+        return [frame_cache[0]], [frame_cache[1]]
+    footer = epdframe.pack_overlay(strip, glyphatlas.TRANSPARENT)
+    return epdframe.overlay_frame(*frame_cache, [(epdframe.PANEL_H - LEFT_MARGIN, footer)])
+
+def prerender_next_day():
+    """
+    Composes and packs tomorrow's frame without the battery text. Runs while
+    the panel refreshes (no SPI traffic), replaces today's caches.
+    Returns (path in DAILY_DIR, (master, slave)), None if not needed.
+    """
+    global frame_cache
+    global image_cache
+
+    if not LOOKAHEAD:
+        return None
+    start = time.perf_counter()
+    try:
+        day = now().date() + timedelta(days=1)
+        number = get_day_index(day)
+        path = daily_frame_path(number, day)
+        if os.path.exists(path) and not daily_frame_stale(path, number):
+            return None
+        if battery_strip(BATTERY_CHARS) is None:
+            # the next boot could not add the battery text
+            print("Look-ahead skipped, battery text not in the glyph atlas")
+            return None
+
+        frame_cache = image_cache = None
+        load_artwork(number)
+        texts = footer_texts(number, (None, None, None))[:3] + ("",)
+        master, slave = prepare_frame(number, date_text(day), texts)
+        frame = b"".join(master), b"".join(slave)
+    except Exception as e:
+        print(f"Look-ahead failed: {e}")
+        return None
+
+    boot_stats["lookahead_s"] = round(time.perf_counter() - start, 2)
+    return path, frame
+
+def save_daily_frame(path, frame):
+    """
+    Writes a look-ahead frame (crash-safe, see atomic_write) and removes
+    the frames of past days and temporary files left by a power cut.
+    """
+    master, slave = frame
+    try:
+        os.makedirs(DAILY_DIR, exist_ok=True)
+        atomic_write(path, [epdframe.frame_header(len(master), len(slave)), master, slave])
+    except Exception as e:
+        print(f"Error saving daily frame: {e}")
+
+    try:
+        # Runs also if the write failed: no *.tmp is being written any more
+        today = now().date().isoformat()
+        for name in os.listdir(DAILY_DIR):
+            if name.endswith(".tmp") or (name.endswith(epdframe.FRAME_EXT) and name[:10] < today):
+                os.remove(os.path.join(DAILY_DIR, name))
+    except Exception as e:
+        print(f"Error cleaning {DAILY_DIR}: {e}")
+
+def frame_fingerprint(number, date_str, texts):
+    """
+    Identifies the complete frame: day index, hash of the cached artwork
+    and the texts drawn on the margins.
+    """
+    digest = hashlib.sha256()
+    if frame_cache is not None:
+        for half in frame_cache:
+            digest.update(half)
+    else:
+        digest.update(image_cache.tobytes())
+
+    return {
+        "index": number,
+        "content": digest.hexdigest(),
+        "date": date_str,
+        "footer": "".join(texts),
+    }
+
+def load_fingerprint():
+    try:
+        with open(FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def atomic_write(path, chunks):
+    """
+    Crash-safe write: temporary file, fsync, atomic rename, fsync of the directory.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    dir_fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+def save_fingerprint(fingerprint):
+    try:
+        atomic_write(FINGERPRINT_FILE, [json.dumps(fingerprint).encode("utf-8")])
+    except Exception as e:
+        print(f"Error saving fingerprint: {e}")
+
+def mark_phase(name):
+    if sampler is not None:
+        sampler.phase(name)
+
+def save_boot_record(number):
+    """
+    Stops the energy sampler and writes this boot's record to the ring file.
+    Called after the panel is powered down, only the first call writes.
+    """
+    global record_saved
+    with record_lock:
+        if record_saved:
+            return
+        record_saved = True
+        write_boot_record(number)
+
+def write_boot_record(number):
+    summary = sampler.stop()
+    print("Energy:", summary)
+
+    telemetry = boot_stats.get("telemetry", (None, None, None))
+    flags = 0
+    if boot_stats.get("skipped"):
+        flags |= bootlog.FLAG_SKIPPED
+    if boot_stats.get("cleared"):
+        flags |= bootlog.FLAG_CLEARED
+    if boot_stats.get("error"):
+        flags |= bootlog.FLAG_ERROR
+    if boot_stats.get("watchdog"):
+        flags |= bootlog.FLAG_WATCHDOG
+    for phase, seconds, kind in epd.busy_overruns:
+        flags |= bootlog.FLAG_TIMEOUT if kind == "timeout" else bootlog.FLAG_SLOW
+
+    record = {
+        "time": time.time() + clock_offset.total_seconds(),
+        "index": number,
+        "flags": flags,
+        "voltage": telemetry[0],
+        "current": telemetry[1],
+        "celsius": telemetry[2],
+        "soc": battery_soc(telemetry),
+        "uptime_s": summary["uptime_s"],
+        "mAh": summary["mAh"],
+        "phases": {name: (s, mah) for name, (s, mah, mwh) in summary["phases"].items()},
+        "busy": epd.busy_timings,
+    }
+    try:
+        bootlog.append_record(RING_FILE, record)
+    except Exception as e:
+        print(f"Error saving boot record: {e}")
+
+def watchdog_expired(number):
+    """
+    Aborts as a BUSY timeout does: POF, deep sleep, boot record, then the
+    Pi is powered off. Runs in the timer thread: epd.abort() stops the
+    thread using the panel and waits for it, the panel is never driven
+    from two threads at once.
+    """
+    print(f"Watchdog: refresh still running after {REFRESH_WATCHDOG} s, forcing shutdown")
+    boot_stats["error"] = 1
+    boot_stats["watchdog"] = 1
+    try:
+        if not epd.abort():
+            print("Watchdog: panel not released, powering off without POF")
+    except Exception:
+        traceback.print_exc()
+    boot_stats["busy"] = [(phase, round(t, 2)) for phase, t in epd.busy_timings]
+    print("Boot stats:", boot_stats)
+    mark_phase("shutdown")
+    save_boot_record(number)
+    epd.shutdown()
+
 def display(number):
     print("Display JPG #", number)
 
+    date_str = date_text()
+    telemetry = read_telemetry()
+    boot_stats["telemetry"] = telemetry
+    texts = (battery_label(telemetry),) if precomposed else footer_texts(number, telemetry)
+    fingerprint = frame_fingerprint(number, date_str, texts)
+    if fingerprint == load_fingerprint():
+        print("Frame already displayed, refresh skipped")
+        boot_stats["skipped"] = 1
+        print("Boot stats:", boot_stats)
+        return
+
     try:
+        mark_phase("init")
         epd.Init()
-        epd.Clear()
-        img = image_cache
-        draw_date(img, number)
-        draw_footer(img, number)
-        epd.display(epd.getbuffer(img))
+        cleared = clear_required(get_days_elapsed())
+        boot_stats["clear_policy"] = CLEAR_POLICY
+        boot_stats["cleared"] = int(cleared)
+        pending = None
+        mark_phase("clear" if cleared else "compose")
+        if cleared:
+            start = time.perf_counter()
+            # The clear waveform runs in the background while the frame is
+            # composited, telemetry is read over I2C and the frame is prepared
+            pending = epd.Clear(wait=False)
+
+        if precomposed:
+            boot_stats["precomposed"] = 1
+            frame = patch_battery(texts[0])
+        else:
+            frame = prepare_frame(number, date_str, texts)
+
+        if pending is not None:
+            epd.wait_refresh()
+            boot_stats["clear_s"] = round(time.perf_counter() - start, 2)
+
+        mark_phase("display")
+        start = time.perf_counter()
+        epd.display_stream(*frame, wait=False)
+        # The CPU is idle during the refresh waveform: compose tomorrow's frame
+        lookahead = prerender_next_day()
+        epd.wait_refresh()
+        boot_stats["display_s"] = round(time.perf_counter() - start, 2)
+        mark_phase("shutdown")
         epd.sleep()
 
+        # Panel confirmed POF and is powered down, SPI closed: safe to write
+        save_fingerprint(fingerprint)
+        if lookahead is not None:
+            save_daily_frame(*lookahead)
+
     except Exception:
+        boot_stats["error"] = 1
+        mark_phase("shutdown")
         epd.sleep()
         traceback.print_exc()
 
+    boot_stats["busy"] = [(phase, round(t, 2)) for phase, t in epd.busy_timings]
+    if epd.busy_overruns:
+        boot_stats["overruns"] = [(phase, round(t, 2), kind) for phase, t, kind in epd.busy_overruns]
+    print("Boot stats:", boot_stats)
+
 if __name__ == "__main__":
 
-    set_wittypi_daily_boot("02:00:00")
+    boot_stats["import_s"] = round(time.perf_counter() - IMPORT_START, 3)
+    if boot_stats["import_s"] * 1000 > IMPORT_BUDGET_MS:
+        print(f"Import time {boot_stats['import_s'] * 1000:.0f} ms over budget ({IMPORT_BUDGET_MS} ms)")
+
+    epd = epd13in3E.EPD()
+    witty = wittypi.WittyPi()
+    sampler = energy.EnergySampler(witty).start("boot")
+
+    check_clock()
+    witty.set_daily_boot("02:00:00", now=now())
 
     num = 0
 
@@ -497,9 +1039,17 @@ if __name__ == "__main__":
     if epd.check_if_maintenance():
         print("MAINTENANCE MODE DETECTED")
     else:
+        watchdog = threading.Timer(REFRESH_WATCHDOG, watchdog_expired, args=(num,))
+        watchdog.daemon = True
+        watchdog.start()
         try:
+            mark_phase("cache_data")
             cache_data(num)
             display(num)
         finally:
+            watchdog.cancel()
+            mark_phase("shutdown")
+            save_boot_record(num)
+            witty.close()
             epd.shutdown()
 
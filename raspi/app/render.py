@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   render.py
+# * | Function    :   Headless rendering of the daily frame (no panel, no I2C)
+# * | Info        :   python3 render.py 42                      artwork 42, today's date
+# * |             :   python3 render.py 2026-03-01 2026-03-07   one frame per day
+# * |             :   python3 render.py --bench                 one day per artwork
+# * |             :   python3 render.py --format e6 --no-battery --output pic/daily 2026-03-01 2026-03-31
+# * |             :                                             precomposed frames for refresh.py
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   --no-battery
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+from datetime import datetime, timedelta
+
+# The driver is only used for packing, the emulator backend keeps it off the hardware
+os.environ.setdefault("EPD_BACKEND", "emu")
+os.environ.setdefault("EPD_EMU_QUIET", "1")
+
+import refresh
+import epd13in3E
+import epdframe
+import wittypi
+
+OUTPUT_DIR = "render"
+TELEMETRY = (15.60, 0.05, 25.0)     # voltage, current, celsius of the fake Witty Pi
+
+STAGES = ("load", "texts", "compose", "pack")
+
+
+def render_day(epd, day, number, timings=None, battery=True):
+    """
+    Renders artwork `number` as shown on `day`, without the battery text
+    if not battery. Returns (image, packed frame); adds seconds per stage to timings.
+    """
+    t0 = time.perf_counter()
+    refresh.frame_cache = None
+    refresh.image_cache = None
+    refresh.load_artwork(number)
+    t1 = time.perf_counter()
+    texts = refresh.footer_texts(number)
+    if not battery:
+        texts = texts[:3] + ("",)
+    t2 = time.perf_counter()
+    img = refresh.compose(number, refresh.date_text(day), texts)
+    t3 = time.perf_counter()
+    packed = epd.getbuffer(img)
+    t4 = time.perf_counter()
+
+    if timings is not None:
+        for stage, elapsed in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+            timings[stage].append(elapsed)
+    return img, packed
+
+
+def save(img, packed, path, fmt):
+    if fmt == "e6":
+        epdframe.write_frame(path, packed)
+    else:
+        img.save(path, format="PNG")
+
+
+def days(args):
+    if args.first is None:
+        today = datetime.now().date()
+        return [(today, args.index or refresh.get_day_index(today))]
+
+    first = datetime.strptime(args.first, "%Y-%m-%d").date()
+    last = datetime.strptime(args.last, "%Y-%m-%d").date() if args.last else first
+    count = (last - first).days + 1
+    return [(d, refresh.get_day_index(d)) for d in (first + timedelta(days=i) for i in range(count))]
+
+
+def bench(epd, count):
+    timings = {stage: [] for stage in STAGES}
+    first = refresh.REFERENCE_DATE
+
+    start = time.perf_counter()
+    for i in range(count):
+        day = first + timedelta(days=i)
+        with contextlib.redirect_stdout(io.StringIO()):
+            render_day(epd, day, refresh.get_day_index(day), timings)
+    total = time.perf_counter() - start
+
+    print(f"Rendered {count} days, {total:.2f} s, {count / total:.2f} frames/s")
+    print(f"{'stage':8} {'mean ms':>9} {'max ms':>9}")
+    for stage in STAGES:
+        t = timings[stage]
+        print(f"{stage:8} {sum(t) / len(t) * 1000:9.1f} {max(t) * 1000:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the daily frame without the panel")
+    parser.add_argument("first", nargs="?", help="artwork index, or first date (YYYY-MM-DD)")
+    parser.add_argument("last", nargs="?", help="last date (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=("png", "e6"), default="png")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="output directory")
+    parser.add_argument("--battery", default=",".join(str(x) for x in TELEMETRY),
+                        help="telemetry as voltage,current,celsius")
+    parser.add_argument("--no-battery", dest="battery_text", action="store_false",
+                        help="leave out the battery text (frames for refresh.DAILY_DIR)")
+    parser.add_argument("--bench", action="store_true", help="render one day per artwork")
+    parser.add_argument("--count", type=int, help="days rendered by --bench (default: catalog size)")
+    args = parser.parse_args()
+
+    # Telemetry goes through the Witty Pi register decoding, on an in-memory register map
+    telemetry = tuple(float(x) for x in args.battery.split(","))
+    refresh.witty = wittypi.WittyPi(wittypi.FakeBus(*telemetry))
+    epd = epd13in3E.EPD()
+    refresh.epd = epd
+
+    if args.bench:
+        bench(epd, args.count or refresh.catalog_size())
+        return
+
+    args.index = None
+    if args.first is not None and args.first.isdigit():
+        args.index, args.first = int(args.first), None
+
+    os.makedirs(args.output, exist_ok=True)
+    ext = epdframe.FRAME_EXT if args.format == "e6" else ".png"
+    for day, number in days(args):
+        img, packed = render_day(epd, day, number, battery=args.battery_text)
+        path = os.path.join(args.output, f"{day.isoformat()}_{number:04d}{ext}")
+        save(img, packed, path, args.format)
+        print(f"Rendered: {path}")
+
+
+if __name__ == "__main__":
+    main()
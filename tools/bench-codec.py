@@ -0,0 +1,110 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   bench-codec.py
+# * | Function    :   Benchmark of .e6 frame codecs: cold read + decompress time
+# * | Info        :   Run on the Pi, in a directory on the SD card, e.g.
+# * |             :   python3 bench-codec.py /home/pi/eink/pic
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import time
+import shutil
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+from PIL import Image
+import epdframe
+
+FRAMES_DIR = "images-enhanced-bmp11"    # output of convert.py
+WORK_DIR = "bench-codec-tmp"            # must be on the storage being measured
+MAX_FRAMES = 20
+
+
+def load_packed(path):
+    """
+    Returns the packed frame (FRAME_BYTES) of a .e6 or .bmp file.
+    """
+    if path.endswith(epdframe.FRAME_EXT):
+        with open(path, "rb") as f:
+            master, slave = epdframe.parse_frame(f.read(), path)
+        return epdframe.join_halves(master, slave).tobytes()
+
+    with Image.open(path) as img:
+        codes = epdframe.panel_indices(img)
+        if codes is None:
+            raise ValueError(f"Not a panel palette image: {path}")
+        return epdframe.pack_indices(codes)
+
+
+def drop_cache(path):
+    # Evict the file from the page cache, so the next read hits the storage
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def main(frames_dir=FRAMES_DIR):
+    sources = sorted(f for f in os.listdir(frames_dir)
+                     if f.endswith((epdframe.FRAME_EXT, ".bmp")))[:MAX_FRAMES]
+    if not sources:
+        print(f"No .e6 / .bmp frames in {frames_dir}")
+        sys.exit(1)
+
+    frames = [load_packed(os.path.join(frames_dir, f)) for f in sources]
+    os.makedirs(WORK_DIR, exist_ok=True)
+
+    print(f"{len(frames)} frames from {frames_dir}, averages per frame")
+    print(f"{'codec':6} {'stored':>6} {'size KB':>9} {'read ms':>9} {'decode ms':>10} {'total ms':>9}")
+
+    try:
+        for name, codec in epdframe.CODECS.items():
+            paths = []
+            size = 0
+            stored = 0
+            for i, packed in enumerate(frames):
+                path = os.path.join(WORK_DIR, f"{i:04d}_{name}{epdframe.FRAME_EXT}")
+                data = epdframe.encode_frame(packed, codec)
+                with open(path, "wb") as f:
+                    f.write(data)
+                stored += data[5] & epdframe.CODEC_MASK == codec
+                size += len(data)
+                paths.append(path)
+
+            for path in paths:
+                drop_cache(path)
+
+            t_read = 0.0
+            t_decode = 0.0
+            for path, packed in zip(paths, frames):
+                start = time.perf_counter()
+                with open(path, "rb") as f:
+                    data = f.read()
+                mid = time.perf_counter()
+                master, slave = epdframe.parse_frame(data, path)
+                end = time.perf_counter()
+
+                if bytes(master) + bytes(slave) != b"".join(epdframe.split_halves(packed)):
+                    print(f"ERROR: {name} round trip differs for {path}")
+                    sys.exit(1)
+
+                t_read += mid - start
+                t_decode += end - mid
+
+            n = len(frames)
+            print(f"{name:6} {stored:3}/{n:<2} {size / n / 1024:9.1f} {t_read / n * 1000:9.2f} "
+                  f"{t_decode / n * 1000:10.2f} {(t_read + t_decode) / n * 1000:9.2f}")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) == 2 else FRAMES_DIR)
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   bench-driver.py
+# * | Function    :   Runs the EPD driver against the software panel emulator
+# * | Info        :   No hardware needed, e.g.
+# * |             :   python3 bench-driver.py images-enhanced-bmp11/0001_1600x1200.bmp
+# * |             :   Checks the frame latched by the emulator against getbuffer()
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import time
+
+os.environ["EPD_BACKEND"] = "emu"
+os.environ.setdefault("EPD_EMU_QUIET", "1")
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+from PIL import Image
+import epd13in3E
+import epdemu
+import epdframe
+
+OUTPUT_PNG = "emulated.png"
+
+
+def expected_halves(epd, path):
+    if path.endswith(epdframe.FRAME_EXT):
+        with open(path, "rb") as f:
+            master, slave = epdframe.parse_frame(f.read(), path)
+        return bytes(master), bytes(slave)
+    with Image.open(path) as img:
+        return tuple(bytes(h) for h in epdframe.split_halves(epd.getbuffer(img)))
+
+
+def run(epd, path):
+    timings = {}
+
+    start = time.perf_counter()
+    epd.Init()
+    timings["init"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    epd.Clear()
+    timings["clear"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if path.endswith(epdframe.FRAME_EXT):
+        master, slave = epdframe.load_frame(path)
+        epd.display_frame(master, slave)
+    else:
+        with Image.open(path) as img:
+            img.load()
+            epd.display_image(img)
+    timings["display"] = time.perf_counter() - start
+
+    epd.sleep()
+    return timings
+
+
+def main(path, output=OUTPUT_PNG):
+    epd = epd13in3E.EPD()
+    timings = run(epd, path)
+
+    master, slave = epdemu.panel.frame()
+    exp_master, exp_slave = expected_halves(epd, path)
+    ok = master == exp_master and slave == exp_slave
+
+    epdemu.panel.save_png(output)
+    stats = epdemu.report()
+
+    print(f"Frame        : {path} -> {output}")
+    for name, elapsed in timings.items():
+        print(f"{name:13}: {elapsed * 1000:8.1f} ms host")
+    print(f"SPI          : {stats['spi_bytes']} bytes, {stats['spi_calls']} calls, "
+          f"{stats['spi_syscalls']} ioctls, {stats['spi_s']:.2f} s on the bus")
+    print(f"GPIO writes  : {stats['gpio_writes']}, commands: {stats['commands']}, "
+          f"refreshes: {stats['refreshes']}")
+    print(f"Panel time   : {stats['sim_time_s']:.2f} s simulated ({stats['busy_s']:.2f} s BUSY)")
+    print(f"Regression   : {'OK' if ok else 'FRAME MISMATCH'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 bench-driver.py <frame.bmp|frame.e6> [output.png]")
+        sys.exit(1)
+    main(*sys.argv[1:])
@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   bench-pack.py
+# * | Function    :   Micro-benchmark of 4bpp nibble packing (EPD.getbuffer)
+# * | Info        :   Compares the original Python loop with the NumPy path
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+import numpy as np
+import epdframe
+
+ROUNDS = 5
+
+
+def best_of(func, arg, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(rounds=ROUNDS):
+    # Random panel indices (0..6) for a full 1600x1200 frame
+    rng = np.random.default_rng(1)
+    indices = rng.integers(0, 7, epdframe.PANEL_W * epdframe.PANEL_H, dtype=np.uint8).tobytes()
+
+    ref = epdframe.pack_indices_loop(indices)
+    new = epdframe.pack_indices(indices)
+    if bytes(ref) != new:
+        print("ERROR: NumPy packing differs from the reference loop")
+        sys.exit(1)
+
+    t_loop = best_of(epdframe.pack_indices_loop, indices, rounds)
+    t_numpy = best_of(epdframe.pack_indices, indices, rounds)
+
+    print(f"Frame: {epdframe.PANEL_W}x{epdframe.PANEL_H}, {len(new)} packed bytes, best of {rounds}")
+    print(f"Python loop : {t_loop * 1000:9.2f} ms")
+    print(f"NumPy       : {t_numpy * 1000:9.2f} ms")
+    print(f"Speed-up    : {t_loop / t_numpy:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) == 2 else ROUNDS)
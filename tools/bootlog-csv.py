@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   bootlog-csv.py
+# * | Function    :   Exports the per-boot ring log (boot.ring) as CSV
+# * | Info        :   scp pi@frame:/home/pi/eink/boot.ring .
+# * |             :   python3 bootlog-csv.py boot.ring > boots.csv
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import csv
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+import bootlog
+
+INPUT_FILE = bootlog.RING_FILE
+
+
+def rows(records):
+    for r in records:
+        row = [r["seq"], datetime.fromtimestamp(r["time"]).isoformat(timespec="seconds"), r["index"],
+               int(bool(r["flags"] & bootlog.FLAG_SKIPPED)),
+               int(bool(r["flags"] & bootlog.FLAG_CLEARED)),
+               int(bool(r["flags"] & bootlog.FLAG_ERROR)),
+               int(bool(r["flags"] & bootlog.FLAG_SLOW)),
+               int(bool(r["flags"] & bootlog.FLAG_TIMEOUT)),
+               int(bool(r["flags"] & bootlog.FLAG_WATCHDOG))]
+        row += [r[k] for k in bootlog.FIELDS[4:]]
+        for phase in bootlog.PHASES:
+            row += list(r["phases"].get(phase, (None, None)))
+        # BUSY totals per kind (clear + display refresh) and the full sequence
+        for kind in bootlog.BUSY_PHASES:
+            times = [t for p, t in r["busy"] if p == kind]
+            row.append(round(sum(times), 3) if times else None)
+        row.append(" ".join(f"{p}={t}" for p, t in r["busy"]))
+        yield row
+
+
+def main(path=INPUT_FILE):
+    records = bootlog.read_records(path)
+
+    header = ["seq", "time", "index", "skipped", "cleared", "error", "slow", "timeout", "watchdog"] + list(bootlog.FIELDS[4:])
+    for phase in bootlog.PHASES:
+        header += [f"{phase}_s", f"{phase}_mAh"]
+    header += [f"busy_{kind}_s" for kind in bootlog.BUSY_PHASES] + ["busy"]
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(header)
+    writer.writerows(rows(records))
+    print(f"{len(records)} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) == 2 else INPUT_FILE)
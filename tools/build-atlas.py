@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   build-atlas.py
+# * | Function    :   Pre-render the margin glyphs (date, footer) in panel codes
+# * | Info        :   Output is copied to raspi/app/font/ (see lib/glyphatlas.py)
+# * |             :   Needs the fonts in raspi/app/font/ and index.json
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import json
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+appdir = os.path.join(current_dir, '..', 'raspi', 'app')
+sys.path.append(appdir)
+sys.path.append(os.path.join(appdir, 'lib'))
+
+# refresh.py provides the fonts, colors and texts, the driver is not used
+os.environ.setdefault("EPD_BACKEND", "emu")
+os.environ.setdefault("EPD_EMU_QUIET", "1")
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import refresh
+import epdframe
+import glyphatlas
+
+INDEX_FILE = "index.json"                 # output of transform-json.py
+OUTPUT_FILE = glyphatlas.ATLAS_FILE
+
+BLACK = (0, 0, 0)
+PAD = 16    # room for negative bearings around a glyph
+
+
+def date_chars():
+    # %B of refresh.date_text(), in the locale this tool runs with
+    months = "".join(datetime(2000, month, 1).strftime("%B") for month in range(1, 13))
+    return set("0123456789 " + months)
+
+
+def footer_chars(index):
+    refresh.json_cache = dict(enumerate(index, start=1))
+    chars = set("Ag" + refresh.BATTERY_CHARS)
+    for number in refresh.json_cache:
+        chars.update("".join(refresh.footer_texts(number, (None, None, None))))
+    return chars
+
+
+def render(font, ch, fill, background):
+    """
+    Draws ch alone as refresh.py draws text. Returns (RGB image, crop box of
+    the glyph bitmap, bitmap offset from the text origin).
+    """
+    mask, (ox, oy) = font.getmask2(ch, mode="L")
+    w, h = mask.size
+    img = Image.new("RGB", (2 * PAD + max(ox, 0) + w, 2 * PAD + max(oy, 0) + h), background)
+    ImageDraw.Draw(img).text((PAD, PAD), ch, fill=fill, font=font)
+    return img, (PAD + ox, PAD + oy, PAD + ox + w, PAD + oy + h), (ox, oy)
+
+
+def date_codes(font, ch, color):
+    """
+    Panel codes of draw_date(): quantized to the palette without dithering,
+    white is the background.
+    """
+    img, box, offset = render(font, ch, color, (255, 255, 255))
+    indices = img.quantize(palette=refresh.PALETTE_IMG, dither=Image.NONE).crop(box)
+    codes = epdframe.palette_lut(indices)[np.asarray(indices)]
+    codes[np.asarray(indices) == refresh.MASK_IDX] = glyphatlas.TRANSPARENT
+    return codes, offset
+
+
+def footer_codes(font, ch):
+    """
+    Panel codes of draw_footer(): text on MASK_COLOR pasted onto a canvas in
+    the panel palette.
+    """
+    img, box, offset = render(font, ch, "black", refresh.MASK_COLOR)
+    img = img.crop(box)
+    mask = np.any(np.asarray(img) != refresh.MASK_COLOR, axis=2)
+
+    canvas = Image.new("P", img.size, refresh.WHITE_IDX)
+    canvas.putpalette(epdframe.PANEL_PALETTE + (0, 0, 0) * (256 - len(epdframe.PANEL_PALETTE) // 3))
+    canvas.paste(img, (0, 0), Image.fromarray(mask.astype(np.uint8) * 255, mode="L"))
+
+    codes = epdframe.palette_lut(canvas)[np.asarray(canvas)]
+    codes[~mask] = glyphatlas.TRANSPARENT
+    return codes, offset
+
+
+def advance(font, text):
+    return round(font.getlength(text) * 64)
+
+
+def add_style(glyphs, kerning, style_id, font, chars, codes_of):
+    for ch in sorted(chars):
+        codes, (x, y) = codes_of(font, ch)
+        h, w = codes.shape
+        glyphs[(style_id, ord(ch))] = (advance(font, ch), x, y, w, h, codes.tobytes())
+
+    single = {ch: advance(font, ch) for ch in chars}
+    for left in chars:
+        for right in chars:
+            kerning[(style_id, ord(left), ord(right))] = advance(font, left + right) - single[left] - single[right]
+
+
+def main():
+    with open(INDEX_FILE, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    refresh.load_fonts()
+    footer = footer_chars(index)
+
+    # Style id = position: the date font in every color, the footer fonts in black
+    styles = [("bold", color) for color in refresh.FONT_COLORS]
+    styles += [("regular", BLACK), ("italic", BLACK), ("regular_small", BLACK)]
+    fonts = {"bold": refresh.font_bold, "regular": refresh.font_regular,
+             "italic": refresh.font_italic, "regular_small": refresh.font_regular_small}
+
+    glyphs = {}
+    kerning = {}
+    for style_id, (face, color) in enumerate(styles):
+        if face == "bold":
+            add_style(glyphs, kerning, style_id, fonts[face], date_chars(),
+                      lambda font, ch: date_codes(font, ch, color))
+        else:
+            add_style(glyphs, kerning, style_id, fonts[face], footer, footer_codes)
+        print(f"Added: {face} {color}")
+
+    glyphatlas.write_atlas(OUTPUT_FILE, styles, glyphs, kerning)
+    print(f"Atlas: {OUTPUT_FILE}, {len(styles)} styles, {len(glyphs)} glyphs, "
+          f"{sum(1 for v in kerning.values() if v)} kerning pairs, {os.path.getsize(OUTPUT_FILE)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   build-bundle.py
+# * | Function    :   Pack index.json and all frames into a single bundle file
+# * | Info        :   Output is copied to raspi/app/pic/ (see lib/artbundle.py)
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import json
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+import artbundle
+import epdframe
+
+INDEX_FILE = "index.json"                 # output of transform-json.py
+FRAMES_DIR = "images-enhanced-bmp11"      # output of convert.py
+OUTPUT_FILE = artbundle.BUNDLE_FILE
+
+
+def load_frame(number):
+    """
+    Returns (kind, bytes) of artwork frame, pre-packed .e6 preferred over BMP.
+    """
+    base = os.path.join(FRAMES_DIR, f"{number:04d}_1600x1200")
+
+    if os.path.exists(base + epdframe.FRAME_EXT):
+        with open(base + epdframe.FRAME_EXT, "rb") as f:
+            data = f.read()
+        epdframe.parse_frame(data, base + epdframe.FRAME_EXT)
+        return artbundle.KIND_E6, data
+
+    with open(base + ".bmp", "rb") as f:
+        return artbundle.KIND_BMP, f.read()
+
+
+def records(index):
+    for number, record in enumerate(index, start=1):
+        kind, data = load_frame(number)
+        print(f"Added: {number:04d} ({'e6' if kind == artbundle.KIND_E6 else 'bmp'}, {len(data)} bytes)")
+        yield record, kind, data
+
+
+def main():
+    with open(INDEX_FILE, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    artbundle.write_bundle(OUTPUT_FILE, len(index), records(index))
+    print(f"Bundle: {OUTPUT_FILE}, {len(index)} records, {os.path.getsize(OUTPUT_FILE)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   check-busy.py
+# * | Function    :   Checks the BUSY deadlines of the EPD driver on the emulator
+# * | Info        :   No hardware needed: python3 check-busy.py
+# * |             :   EPD_EMU_SLOW must be recorded as slow, EPD_EMU_HANG as timeout,
+# * |             :   the panel must be powered off (POF) in every case,
+# * |             :   the same EPD must Init again after sleep(), abort() from another
+# * |             :   thread must stop a refresh in progress
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import io
+import contextlib
+import threading
+
+os.environ["EPD_BACKEND"] = "emu"
+os.environ.setdefault("EPD_EMU_QUIET", "1")
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+import epd13in3E
+import epdemu
+
+# name, emulator environment, expected (phase, kind) overruns, BusyTimeout expected
+CASES = (
+    ("normal", {}, [], False),
+    ("slow", {"EPD_EMU_SLOW": "2"}, [("drf", "slow")], False),
+    ("hang", {"EPD_EMU_HANG": "drf"}, [("drf", "timeout"), ("pof", "timeout")], True),
+    ("pon", {"EPD_EMU_HANG": "pon"}, [("pon", "timeout"), ("pof", "timeout")], True),
+)
+
+
+def run(env):
+    """
+    One Init / Clear / sleep cycle. Returns (overruns, BusyTimeout raised,
+    panel powered after sleep).
+    """
+    for name in ("EPD_EMU_SLOW", "EPD_EMU_HANG"):
+        os.environ.pop(name, None)
+    os.environ.update(env)
+    epdemu.panel.busy_until = 0.0       # power cycle of the emulated panel
+
+    epd = epd13in3E.EPD()
+    timeout = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            epd.Init()
+            epd.Clear()
+        except epd13in3E.BusyTimeout:
+            timeout = True
+        epd.sleep()
+    return epd.busy_overruns, timeout, epdemu.panel.powered
+
+
+def abort():
+    """
+    Clear with DRF hung and no DRF deadline: only abort() from a timer thread
+    (the refresh watchdog) ends it. Returns (error, abort result, panel powered).
+    """
+    os.environ.pop("EPD_EMU_SLOW", None)
+    os.environ["EPD_EMU_HANG"] = "drf"
+    epdemu.panel.busy_until = 0.0
+    deadline = epd13in3E.BUSY_DEADLINES["drf"]
+    epd13in3E.BUSY_DEADLINES["drf"] = float("inf")
+
+    epd = epd13in3E.EPD()
+    result = []
+    timer = threading.Timer(0.2, lambda: result.append(epd.abort()))
+    error = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            epd.Init()
+            timer.start()
+            epd.Clear()
+        except Exception as e:
+            error = e
+        timer.join()
+        epd.sleep()
+    epd13in3E.BUSY_DEADLINES["drf"] = deadline
+    os.environ.pop("EPD_EMU_HANG")
+    return error, result, epdemu.panel.powered
+
+
+def reinit():
+    """
+    Init / Clear / sleep twice on the same EPD (sleep() releases the BUSY line).
+    """
+    for name in ("EPD_EMU_SLOW", "EPD_EMU_HANG"):
+        os.environ.pop(name, None)
+    epdemu.panel.busy_until = 0.0
+    epd = epd13in3E.EPD()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            for _ in range(2):
+                epd.Init()
+                epd.Clear()
+                epd.sleep()
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+    return None
+
+
+def main():
+    failed = 0
+    for name, env, expected, expect_timeout in CASES:
+        overruns, timeout, powered = run(env)
+        ok = [(phase, kind) for phase, seconds, kind in overruns] == expected \
+            and timeout == expect_timeout and not powered
+        failed += not ok
+        found = ", ".join(f"{phase} {kind} {seconds:.2f} s" for phase, seconds, kind in overruns) or "none"
+        print(f"{name:7}: {'OK' if ok else 'FAILED'} (overruns: {found}, "
+              f"panel {'on' if powered else 'off'} after sleep)")
+    error, result, powered = abort()
+    ok = isinstance(error, epd13in3E.PanelAborted) and result == [True] and not powered
+    failed += not ok
+    print(f"{'abort':7}: {'OK' if ok else 'FAILED'} ({type(error).__name__}, abort() {result}, "
+          f"panel {'on' if powered else 'off'} after sleep)")
+
+    error = reinit()
+    failed += error is not None
+    print(f"{'reinit':7}: {'OK' if error is None else 'FAILED'} ({error or 'Init after sleep'})")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
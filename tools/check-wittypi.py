@@ -0,0 +1,170 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+# /*****************************************************************************
+# * | File        :   check-wittypi.py
+# * | Function    :   Checks the Witty Pi 4 logic against the in-memory FakeBus
+# * | Info        :   No hardware needed: python3 check-wittypi.py
+# * |             :   Register decoding, boot alarm write / read-back / bytewise
+# * |             :   fallback, SOC from telemetry, RTC date when the system
+# * |             :   clock is not set, I2C transactions per boot
+# * | This version:   V1.0
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Initial release
+# *----------------
+# ******************************************************************************/
+
+import os
+import sys
+import io
+import contextlib
+from datetime import datetime, timedelta, timezone
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+appdir = os.path.join(current_dir, '..', 'raspi', 'app')
+sys.path.append(appdir)
+sys.path.append(os.path.join(appdir, 'lib'))
+
+# refresh.py provides the SOC logic, the driver is not used
+os.environ.setdefault("EPD_BACKEND", "emu")
+os.environ.setdefault("EPD_EMU_QUIET", "1")
+
+import refresh
+import wittypi
+from wittypi import WittyPi, FakeBus
+
+NOW = datetime(2026, 3, 1, 14, 30, 0)   # the alarm is set for the next day
+
+
+class DroppedBlockBus(FakeBus):
+    # block writes are acknowledged but not stored: read-back must catch it
+    def write_i2c_block_data(self, address, register, data):
+        self.calls += 1
+
+
+class DroppedWriteBus(DroppedBlockBus):
+    # no write is stored at all
+    def write_byte_data(self, address, register, value):
+        self.calls += 1
+
+
+class FailingBus(FakeBus):
+    def read_i2c_block_data(self, address, register, length):
+        raise OSError("Remote I/O error")
+
+
+def alarm(bus):
+    regs = bus.registers
+    return (list(regs[wittypi.I2C_START_SEC:wittypi.I2C_START_DAY + 1]),
+            list(regs[wittypi.I2C_STOP_SEC:wittypi.I2C_STOP_DAY + 1]))
+
+
+def check_power():
+    witty = WittyPi(FakeBus(voltage=15.62, current=0.35, celsius=23.5, voltage_out=5.08))
+    return witty.power() == (15.62, 5.08, 0.35) and witty.telemetry() == (15.62, 0.35, 23.5)
+
+
+def check_temperature():
+    witty = WittyPi(FakeBus(celsius=-7.25))
+    return witty.temperature() == (-7.25, 18.95)
+
+
+def check_failed_read():
+    witty = WittyPi(FailingBus())
+    return witty.power(report=False) == (None, None, None)
+
+
+def check_block_alarm():
+    bus = FakeBus()
+    bus.registers[wittypi.I2C_STOP_SEC:wittypi.I2C_STOP_DAY + 1] = bytes((0x10, 0x20, 0x03, 0x05))
+    ok = WittyPi(bus).set_daily_boot("02:00:00", now=NOW)
+    # 02:00:00 on day 2, BCD; stop alarm cleared; 2 block writes + 1 block read
+    return ok and alarm(bus) == ([0x00, 0x00, 0x02, 0x02], [0, 0, 0, 0]) and bus.calls == 3
+
+
+def check_bytewise_fallback():
+    bus = DroppedBlockBus()
+    ok = WittyPi(bus).set_daily_boot("23:59:30", now=NOW)
+    return ok and alarm(bus) == ([0x30, 0x59, 0x23, 0x01], [0, 0, 0, 0])
+
+
+def check_alarm_failure():
+    bus = DroppedWriteBus()
+    bus.registers[wittypi.I2C_START_SEC] = 0x45
+    return not WittyPi(bus).set_daily_boot("02:00:00", now=NOW)
+
+
+def check_rtc():
+    bus = FakeBus()
+    utc = datetime(2026, 3, 1, 23, 59, 58, tzinfo=timezone.utc)
+    bus.set_rtc(utc)
+    valid = WittyPi(bus).rtc_time() == utc
+    bus.rtc[wittypi.I2C_RTC_SECONDS] |= 0x80        # oscillator stopped
+    return valid and WittyPi(bus).rtc_time() is None
+
+
+def check_clock():
+    # system clock one day behind the RTC (fake-hwclock): today follows the RTC
+    bus = FakeBus()
+    bus.set_rtc(datetime.now(timezone.utc) + timedelta(days=1))
+    refresh.witty = WittyPi(bus)
+    refresh.check_clock()
+    late = refresh.now().date() == datetime.now().date() + timedelta(days=1)
+    # clock set: no correction
+    refresh.clock_offset = timedelta(0)
+    refresh.witty = WittyPi(FakeBus())
+    refresh.check_clock()
+    refresh.witty = None
+    return late and refresh.clock_offset == timedelta(0)
+
+
+def check_soc():
+    curve = (refresh.soc_with_compensation(15.60) == 60
+             and refresh.soc_with_compensation(17.00) == 100
+             and refresh.soc_with_compensation(10.50) == 0)
+    # load current (IR drop) raises the estimate, cold lowers it
+    compensation = (refresh.soc_with_compensation(15.40, 0.5) > refresh.soc_with_compensation(15.40)
+                    and refresh.soc_with_compensation(15.40, 0.0, 0.0) < refresh.soc_with_compensation(15.40))
+    telemetry = WittyPi(FakeBus(voltage=15.60, current=0.0, celsius=25.0)).telemetry()
+    return curve and compensation and refresh.battery_label(telemetry) == "Battery: 60%" \
+        and refresh.battery_label((None, None, None)) == "Battery: ??%"
+
+
+CHECKS = (
+    ("power", check_power),
+    ("temperature", check_temperature),
+    ("failed read", check_failed_read),
+    ("alarm", check_block_alarm),
+    ("fallback", check_bytewise_fallback),
+    ("no alarm", check_alarm_failure),
+    ("soc", check_soc),
+    ("rtc", check_rtc),
+    ("clock", check_clock),
+)
+
+
+def transactions_per_boot():
+    # what refresh.py does on the bus before the refresh: RTC, alarm, telemetry
+    witty = WittyPi(FakeBus())
+    witty.rtc_time()
+    witty.set_daily_boot("02:00:00", now=NOW)
+    witty.telemetry()
+    return witty.transactions
+
+
+def main():
+    failed = 0
+    for name, check in CHECKS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = check()
+        failed += not ok
+        print(f"{name:12}: {'OK' if ok else 'FAILED'}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        transactions = transactions_per_boot()
+    print(f"I2C per boot: {transactions} transactions (RTC + alarm + telemetry)")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
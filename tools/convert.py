@@ -4,6 +4,11 @@
 # * | File        :	  convert.py
 # * | Function    :   Convert and adjust images to better fit for E-Ink display
 # * | Info        :
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   Added pre-packed panel-native output (.e6), optional compression
+# *----------------
 # * | This version:   V1.0
 # * | Author      :   adam_aph
 # * | Date        :   2026-01-21
@@ -12,9 +17,16 @@
 # ******************************************************************************/
 
 import os
+import sys
 from PIL import Image, ImageOps, ImageEnhance, ImageFilter
 import numpy as np
 
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+import epdframe
+
 DISPLAY_W = 1600
 DISPLAY_H = 1200
 
@@ -28,6 +40,14 @@ IMAGE_AREA_H = DISPLAY_H
 INPUT_DIR = "images"
 OUTPUT_DIR = "images-enhanced-bmp11"
 
+# "bmp": 8bpp BMP (composited by refresh.py)
+# "e6":  pre-packed 4bpp panel stream, already rotated and split into
+#        master/slave halves (see lib/epdframe.py), preferred by refresh.py
+OUTPUT_FORMATS = ("bmp", "e6")
+
+# Compression of .e6 frames: "raw", "rle" or "zlib" (see tools/bench-codec.py)
+FRAME_CODEC = "raw"
+
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Define the exact Spectra 6 Palette (Black, White, Yellow, Red, Blue, Green, Orange)
@@ -42,7 +62,7 @@ ACTUAL_PALETTE = [
     0, 255, 0       # Orange
 ] + [0, 0, 0] * 249 # Fill remaining 256 slots
 
-def process_image(path, output_path):
+def process_image(path, output_base):
     with Image.open(path) as img:
         img = img.convert("RGB")
 
@@ -116,7 +136,16 @@ def process_image(path, output_path):
         canvas = canvas.quantize(palette=pal_image,dither=Image.FLOYDSTEINBERG)
 
         # 8. Save as uncompressed BMP
-        canvas.save(output_path, format="BMP")
+        if "bmp" in OUTPUT_FORMATS:
+            canvas.save(output_base + ".bmp", format="BMP")
+
+        # 9. Save as pre-packed panel frame
+        if "e6" in OUTPUT_FORMATS:
+            codes = epdframe.panel_indices(canvas)
+            if codes is None:
+                raise ValueError(f"Unexpected colors after quantization: {path}")
+            epdframe.write_frame(output_base + epdframe.FRAME_EXT, epdframe.pack_indices(codes),
+                                 epdframe.CODECS[FRAME_CODEC])
 
 def main():
     for filename in os.listdir(INPUT_DIR):
@@ -125,11 +154,11 @@ def main():
 
         input_path = os.path.join(INPUT_DIR, filename)
         name, _ = os.path.splitext(filename)
-        output_filename = f"{name}_1600x1200.bmp"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
+        output_filename = f"{name}_1600x1200"
+        output_base = os.path.join(OUTPUT_DIR, output_filename)
 
-        process_image(input_path, output_path)
-        print(f"Processed: {filename} -> {output_filename}")
+        process_image(input_path, output_base)
+        print(f"Processed: {filename} -> {output_filename} {OUTPUT_FORMATS}")
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,12 @@
 # /*****************************************************************************
 # * | File        :	  transform-json.py
 # * | Function    :   Create final index.json file
-# * | Info        :
+# * | Info        :   and the binary catalog index (lib/artindex.py)
+# * | This version:   V1.1
+# * | Author      :   adam_aph
+# * | Date        :   2026-10-17
+# * | Info        :   index.e6i written next to index.json
+# *----------------
 # * | This version:   V1.0
 # * | Author      :   adam_aph
 # * | Date        :   2026-01-21
@@ -11,11 +16,18 @@
 # *----------------
 # ******************************************************************************/
 
+import os
 import json
 import sys
 
+current_dir = os.path.dirname(os.path.realpath(__file__))
+libdir = os.path.join(current_dir, '..', 'raspi', 'app', 'lib')
+sys.path.append(libdir)
+
+import artindex
 
-def transform(input_path, output_path):
+
+def transform(input_path, output_path, index_path=artindex.INDEX_FILE):
     with open(input_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
@@ -33,6 +45,10 @@ def transform(input_path, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(output, f, ensure_ascii=False, indent=2)
 
+    # Same records for refresh.py: fixed-size entries + string table, one lookup per boot
+    artindex.write_index(index_path, output)
+    print(f"Index: {output_path}, {index_path}, {len(output)} records")
+
 
 if __name__ == "__main__":
     # if len(sys.argv) != 3: